@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import uuid
+import random
+import hashlib
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from dotenv import load_dotenv
+from result_model import TestResult, iter_json_array
+
+load_dotenv()
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000/api")
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+DEFAULT_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", "20"))
+RESULT_BATCH_DELAY = float(os.getenv("RESULT_BATCH_DELAY", "5"))  # Seconds a result may wait in the buffer
+ARTIFACT_UPLOAD = os.getenv("ARTIFACT_UPLOAD", "true").lower() == "true"  # false = inline screenshots as base64
+SPOOL_DIR = os.getenv("RESULT_SPOOL_DIR", os.path.join(os.path.dirname(__file__), "result_spool"))
+
+
+class BackendClient:
+    """
+    Shared HTTP client for the Go backend.
+    Keeps connections alive in a pool, applies explicit timeouts and retries
+    transient failures with jittered exponential backoff.
+    """
+    def __init__(self, base_url=BACKEND_URL, pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.known_artifacts = set()
+        self.artifacts_supported = True
+
+    def request(self, method, path, retries=None, timeout=DEFAULT_TIMEOUT, idempotent=None, **kwargs):
+        """
+        Sends a request, retrying transient failures. Requests that are not `idempotent`
+        (by default every POST) are only retried when they never reached the backend,
+        since a timeout or a 5xx may come after the backend already acted on them.
+        """
+        retries = self.retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        data = kwargs.pop("data", None)
+        while True:
+            try:
+                # A callable body is re-created per attempt (streaming generators can only be read once)
+                body = data() if callable(data) else data
+                resp = self.session.request(method, url, timeout=timeout, data=body, **kwargs)
+                if resp.status_code not in RETRY_STATUSES or attempt >= retries or not idempotent:
+                    return resp
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries or not (idempotent or not_sent(e)):
+                    raise
+            attempt += 1
+            time.sleep(min(0.5 * (2 ** attempt), 10) * random.uniform(0.5, 1.5))
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def upload_artifact(self, data, content_type="application/octet-stream"):
+        """
+        Uploads binary content keyed by its SHA-256 hash and returns the hash.
+        Content the backend already has is never sent twice.
+        Returns None when the backend has no artifact endpoint (caller should inline the data).
+        """
+        if not self.artifacts_supported:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self.known_artifacts:
+            return digest
+
+        if self.request("HEAD", f"/artifacts/{digest}").status_code == 200:
+            self.known_artifacts.add(digest)
+            return digest
+
+        resp = self.post(f"/artifacts/{digest}", data=data, headers={"Content-Type": content_type}, idempotent=True)
+        if resp.status_code in (404, 405):
+            print("Backend has no artifact endpoint. Falling back to inline screenshots.")
+            self.artifacts_supported = False
+            return None
+        resp.raise_for_status()
+        self.known_artifacts.add(digest)
+        return digest
+
+    def save_results(self, results, batch_id=None, offset=0):
+        """
+        Uploads a list of results in one request.
+        Bodies are streamed (chunked) straight from the TestResult objects.
+        The backend upserts each result on `batch_id` and its position (`offset` + index), so the
+        same batch can be retried or replayed without storing duplicates.
+        Falls back to one POST /save-result per item on backends without the bulk endpoint.
+        Raises when the backend cannot be reached or rejects the results (see is_transient).
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        headers = {"Content-Type": "application/json", "X-Batch-Id": batch_id, "X-Batch-Offset": str(offset)}
+        resp = self.post("/save-results", data=lambda: iter_json_array(results), headers=headers, idempotent=True)
+        if resp.status_code == 413 and len(results) > 1:
+            # Over the backend's body limit (e.g. many inline screenshots): upload in halves
+            middle = len(results) // 2
+            self.save_results(results[:middle], batch_id, offset)
+            self.save_results(results[middle:], batch_id, offset + middle)
+            return
+        if resp.status_code in (404, 405):
+            for result in results:
+                body = lambda result=result: (piece.encode("utf-8") for piece in result.iter_json())
+                self.post("/save-result", data=body, headers=headers).raise_for_status()
+            return
+        resp.raise_for_status()
+
+
+def not_sent(error):
+    """
+    True when a request failed before it reached the backend (no connection could be made).
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def is_transient(error):
+    """
+    True for upload errors worth retrying later (backend unreachable or failing with a 5xx),
+    False when the backend rejected the request itself (4xx): it would be rejected again.
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is None or error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+_background = None  # Set by the worker core: schedules a callable off the calling (browser) thread
+
+
+def set_background(submit):
+    global _background
+    _background = submit
+
+
+def in_background(func, *args):
+    """
+    Runs `func(*args)` on the worker's upload task (in submission order) when the async core
+    is running, inline otherwise. Keeps backend latency out of test wall time.
+    """
+    if _background:
+        _background(func, *args)
+    else:
+        func(*args)
+
+
+class ResultBatcher:
+    """
+    Buffers results and uploads them in batches.
+    A batch is flushed when it reaches `max_size`, when the oldest result has waited
+    `max_delay` seconds, or when flush() is called explicitly (e.g. end of a suite).
+    If the backend is down the batch is written to SPOOL_DIR and replayed on the next successful flush;
+    a batch the backend rejects (4xx) is set aside as a .rejected file instead of being retried.
+    Flushes run one at a time, so a flush returns only after every result added before it was sent.
+    """
+    def __init__(self, client=None, max_size=RESULT_BATCH_SIZE, max_delay=RESULT_BATCH_DELAY, spool_dir=SPOOL_DIR):
+        self.client = client or get_client()
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.spool_dir = spool_dir
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # A timer flush may still be uploading when the job finishes
+        self.replay_lock = threading.Lock()
+        self.timer = None
+
+    def add(self, result):
+        result = TestResult.from_dict(result)
+        try:
+            result.validate()
+        except ValueError as e:
+            print(f"Invalid result ({e}). Recording it as FAIL.")
+            result.testName = result.testName or "Unnamed Test"
+            result.status = "FAIL"
+            result.message = f"{result.message or ''} [invalid result: {e}]".strip()
+            result.validate()
+
+        with self.lock:
+            self.buffer.append(result)
+            full = len(self.buffer) >= self.max_size
+            if not full and self.timer is None:
+                self.timer = threading.Timer(self.max_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if full:
+            in_background(self.flush)
+
+    def flush(self):
+        with self.flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self.lock:
+            batch, self.buffer = self.buffer, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not batch:
+            return True
+        batch_id = uuid.uuid4().hex  # Kept when the batch is spooled, so a replay never duplicates it
+
+        # Screenshots may still be encoding in the background; wait for them only now
+        uploader = self.client.upload_artifact if ARTIFACT_UPLOAD else None
+        for result in batch:
+            result.resolve_screenshot(uploader=uploader)
+            result.resolve_visual(uploader=uploader)
+
+        try:
+            print(f"Uploading {len(batch)} result(s)...")
+            self.client.save_results(batch, batch_id)
+        except Exception as e:
+            if not is_transient(e):
+                print(f"Backend rejected {len(batch)} result(s) ({e}). Setting them aside in {self.spool_dir}.")
+                self.spool(batch, batch_id, ".rejected")
+                return False
+            print(f"Result upload failed ({e}). Spooling {len(batch)} result(s) to disk.")
+            self.spool(batch, batch_id)
+            return False
+
+        self.replay_spool()
+        return True
+
+    def spool(self, batch, batch_id, suffix=".json"):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"{int(time.time() * 1000)}-{batch_id}{suffix}")
+        with open(path, "wb") as f:
+            for piece in iter_json_array(batch):
+                f.write(piece)
+
+    def replay_spool(self):
+        if not os.path.isdir(self.spool_dir) or not self.replay_lock.acquire(blocking=False):
+            return
+        try:
+            self._replay_spool()
+        finally:
+            self.replay_lock.release()
+
+    def _replay_spool(self):
+        for name in sorted(os.listdir(self.spool_dir)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            try:
+                with open(path) as f:
+                    batch = [TestResult.from_dict(item) for item in json.load(f)]
+                self.client.save_results(batch, name[:-len(".json")].split("-", 1)[-1])
+                os.remove(path)
+                print(f"Replayed {len(batch)} spooled result(s) from {name}")
+            except Exception as e:
+                if is_transient(e):
+                    print(f"Spool replay stopped at {name}: {e}")
+                    return
+                # Rejected (or unreadable): set aside so it never blocks the batches after it
+                print(f"Spooled batch {name} cannot be replayed ({e}). Setting it aside.")
+                os.replace(path, path[:-len(".json")] + ".rejected")
+
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_client():
+    """
+    Returns the process-wide BackendClient so every caller shares one connection pool.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = BackendClient()
+        return _CLIENT
@@ -1,16 +1,130 @@
+import os
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from tracing import span
+
+WAIT_TIMEOUT = float(os.getenv("WAIT_TIMEOUT", "10"))  # Seconds
+WAIT_POLL_INTERVAL = float(os.getenv("WAIT_POLL_INTERVAL", "0.1"))  # Seconds between condition checks
+
+
 class BasePage:
     """
     Base Page Object Model class.
     Provides common methods for interacting with the browser.
+    Every interaction waits explicitly for the condition it needs instead of sleeping,
+    and each wait is recorded in `waits` so a test can report where its time went.
     """
-    def __init__(self, driver):
+    def __init__(self, driver, timeout=WAIT_TIMEOUT, poll_interval=WAIT_POLL_INTERVAL):
         self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.waits = []  # (name, seconds, satisfied)
+
+    # --- Wait engine -------------------------------------------------
+
+    def wait_until(self, condition, name, timeout=None, raise_on_timeout=True):
+        """
+        Polls `condition(driver)` until it returns a truthy value and returns it.
+        Records how long the wait took. On timeout raises TimeoutException,
+        or returns False when `raise_on_timeout` is off.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.time()
+        try:
+            with span("wait", condition=name):
+                value = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(condition)
+            self.waits.append((name, round(time.time() - start, 3), True))
+            return value
+        except TimeoutException:
+            self.waits.append((name, round(time.time() - start, 3), False))
+            if raise_on_timeout:
+                raise
+            return False
+
+    def wait_clickable(self, locator, timeout=None):
+        return self.wait_until(EC.element_to_be_clickable(locator), f"clickable {locator[1]}", timeout)
+
+    def wait_present(self, locator, timeout=None):
+        return self.wait_until(EC.presence_of_element_located(locator), f"present {locator[1]}", timeout)
+
+    def wait_visible(self, locator, timeout=None):
+        return self.wait_until(EC.visibility_of_element_located(locator), f"visible {locator[1]}", timeout)
+
+    def wait_url_contains(self, fragment, timeout=None, raise_on_timeout=True):
+        return self.wait_until(EC.url_contains(fragment), f"url contains {fragment}", timeout, raise_on_timeout)
+
+    def wait_url_change(self, old_url, timeout=None, raise_on_timeout=True):
+        return self.wait_until(EC.url_changes(old_url), "url change", timeout, raise_on_timeout)
+
+    def wait_text_present(self, text, timeout=None, raise_on_timeout=True):
+        return self.wait_until(lambda d: text in d.page_source, f"text '{text}'", timeout, raise_on_timeout)
+
+    def wait_dom_stable(self, quiet_period=0.3, timeout=None, raise_on_timeout=False):
+        """
+        Waits until the document is loaded and the DOM size has not changed for `quiet_period` seconds.
+        """
+        state = {"size": None, "since": time.time()}
+
+        def stable(driver):
+            size = driver.execute_script(
+                "return document.readyState === 'complete' ? document.getElementsByTagName('*').length : -1"
+            )
+            now = time.time()
+            if size != state["size"] or size < 0:
+                state["size"], state["since"] = size, now
+                return False
+            return now - state["since"] >= quiet_period
+
+        return self.wait_until(stable, "dom stable", timeout, raise_on_timeout)
+
+    def wait_network_idle(self, idle_period=0.5, timeout=None, raise_on_timeout=False):
+        """
+        Waits until no new resource has started loading for `idle_period` seconds,
+        based on the browser's Performance (Resource Timing) entries.
+        """
+        state = {"count": None, "since": time.time()}
+
+        def idle(driver):
+            count = driver.execute_script(
+                "return document.readyState === 'complete' ? performance.getEntriesByType('resource').length : -1"
+            )
+            now = time.time()
+            if count != state["count"] or count < 0:
+                state["count"], state["since"] = count, now
+                return False
+            return now - state["since"] >= idle_period
+
+        return self.wait_until(idle, "network idle", timeout, raise_on_timeout)
+
+    def total_wait_time(self):
+        return round(sum(seconds for _, seconds, _ in self.waits), 3)
+
+    def wait_summary(self):
+        """
+        One line per wait, e.g. "url contains /dashboard: 0.42s", for logs and result messages.
+        """
+        lines = [f"{name}: {seconds}s{'' if ok else ' (timeout)'}" for name, seconds, ok in self.waits]
+        return f"Waited {self.total_wait_time()}s total. " + "; ".join(lines)
+
+    # --- Actions -----------------------------------------------------
 
     def find(self, locator):
-        return self.driver.find_element(*locator)
+        """
+        Element in the DOM, visible or not (hidden inputs, collapsed menus).
+        """
+        return self.wait_present(locator)
+
+    def find_visible(self, locator):
+        return self.wait_visible(locator)
 
     def click(self, locator):
-        self.find(locator).click()
+        element = self.wait_clickable(locator)
+        with span("action.click", locator=locator[1]):
+            element.click()
 
     def type(self, locator, text):
-        self.find(locator).send_keys(text)
+        element = self.find_visible(locator)
+        with span("action.type", locator=locator[1]):
+            element.send_keys(text)
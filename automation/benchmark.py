@@ -0,0 +1,302 @@
+"""
+Reproducible worker benchmark.
+
+Starts a local stand-in for the Go API and a static test site, runs the real
+worker (local_runner.py) against them with headless Chrome on the synthetic
+`benchmark_site` project, and reports throughput, job-pickup latency,
+per-case overhead and worker RSS as JSON.
+
+    python benchmark.py --jobs 20 --interval 0.5 --slots 2
+    python benchmark.py --baseline benchmark_results/<previous>.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler, SimpleHTTPRequestHandler
+from case_isolation import process_tree_rss_mb
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(AUTOMATION_DIR, "benchmark_results")
+PROJECT_ID = "000000000000000000000b01"
+
+SITE_PAGES = {
+    "index.html": '<html><body><h1>Benchmark</h1><a id="to-list" href="list.html">List</a></body></html>',
+    "login.html": (
+        '<html><body><form action="secure.html">'
+        '<input id="username" name="u"><input id="password" name="p" type="password">'
+        '<button id="submit" type="submit">Login</button></form></body></html>'
+    ),
+    "secure.html": "<html><body><h1>Logged In Successfully</h1></body></html>",
+    "list.html": "<html><body><ul>" + "".join(f'<li id="item-{i}">Item {i}</li>' for i in range(100)) + "</ul></body></html>",
+}
+
+
+class FakeBackend:
+    """
+    In-memory implementation of the worker-facing endpoints of the Go API.
+    Records when each job was queued, claimed and finished.
+    """
+    def __init__(self, site_url):
+        self.site_url = site_url
+        self.lock = threading.Condition()
+        self.pending = []
+        self.jobs = {}  # id -> {queuedAt, claimedAt, finishedAt, status}
+        self.results = []
+        self.polls = 0
+        self.heartbeats = 0
+
+    def queue_job(self):
+        job_id = uuid.uuid4().hex[:24]
+        with self.lock:
+            self.jobs[job_id] = {"queuedAt": time.time(), "claimedAt": None, "finishedAt": None, "status": "Pending"}
+            self.pending.append(job_id)
+            self.lock.notify_all()
+        return job_id
+
+    def claim(self, wait):
+        deadline = time.time() + wait
+        with self.lock:
+            self.polls += 1
+            while not self.pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.lock.wait(remaining)
+            job_id = self.pending.pop(0)
+            self.jobs[job_id].update(claimedAt=time.time(), status="Processing")
+            return {"id": job_id, "projectId": PROJECT_ID, "type": "FullSuite", "status": "Processing"}
+
+    def finish(self, job_id, status):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job and status in ("Completed", "Failed"):
+                job.update(finishedAt=time.time(), status=status)
+                self.lock.notify_all()
+
+    def done(self):
+        return all(job["finishedAt"] for job in self.jobs.values())
+
+    def handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def body(self):
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    # Streamed uploads (/save-results) arrive without a Content-Length
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                        if not size:
+                            self.rfile.readline()
+                            return b"".join(chunks)
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def reply(self, status, payload=None, headers=None):
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if data and self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                if path == "/api/jobs/next":
+                    params = dict(p.split("=", 1) for p in query.split("&") if "=" in p)
+                    job = backend.claim(min(float(params.get("wait", 0)), 30))
+                    if job:
+                        return self.reply(200, {"success": True, "data": job}, {"X-Long-Poll": "1"})
+                    return self.reply(204, None, {"X-Long-Poll": "1"})
+                if path == f"/api/projects/{PROJECT_ID}":
+                    return self.reply(200, {"success": True, "data": {
+                        "id": PROJECT_ID, "name": "Benchmark Site",
+                        "baseUrl": backend.site_url, "directory": "benchmark_site",
+                    }})
+                self.reply(404, {"success": False, "message": "Not found"})
+
+            def do_HEAD(self):
+                self.reply(404)  # No artifact is ever known: exercises the upload path
+
+            def do_POST(self):
+                path = self.path.partition("?")[0]
+                body = self.body()
+                if path == "/api/jobs/update-status":
+                    data = json.loads(body)
+                    backend.finish(data["id"], data["status"])
+                elif path == "/api/save-result":
+                    backend.results.append(json.loads(body))
+                elif path == "/api/save-results":
+                    backend.results.extend(json.loads(body))
+                elif path == "/api/worker-heartbeat":
+                    backend.heartbeats += 1
+                elif path in ("/api/jobs/release", "/api/jobs/renew-lease", "/api/jobs/events"):
+                    pass  # Single worker: leases never expire here
+                elif not path.startswith("/api/artifacts/"):
+                    return self.reply(404, {"success": False, "message": "Not found"})
+                self.reply(200, {"success": True})
+
+            def do_DELETE(self):
+                self.reply(200, {"success": True})
+
+        return Handler
+
+
+def start_server(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+def run_benchmark(args):
+    site_dir = tempfile.mkdtemp(prefix="bench_site_")
+    for name, html in SITE_PAGES.items():
+        with open(os.path.join(site_dir, name), "w") as f:
+            f.write(html)
+    site_handler = partial(SimpleHTTPRequestHandler, directory=site_dir)
+    site_handler.log_message = lambda *a: None
+    site_server, site_url = start_server(site_handler)
+
+    backend = FakeBackend(site_url)
+    api_server, api_url = start_server(backend.handler())
+
+    env = dict(os.environ,
+               BACKEND_URL=f"{api_url}/api",
+               HEADLESS="true",
+               WORKER_SLOTS=str(args.slots),
+               WORKER_ID="benchmark-worker",
+               RESULT_SPOOL_DIR=tempfile.mkdtemp(prefix="bench_spool_"))
+    worker = subprocess.Popen([sys.executable, "local_runner.py"], cwd=AUTOMATION_DIR, env=env,
+                              stdout=None if args.verbose else subprocess.DEVNULL,
+                              stderr=None if args.verbose else subprocess.DEVNULL)
+
+    rss_samples = []
+    stop_sampling = threading.Event()
+
+    def sample_rss():
+        while not stop_sampling.wait(0.5):
+            rss = process_tree_rss_mb(worker.pid)
+            if rss:
+                rss_samples.append(rss)
+    threading.Thread(target=sample_rss, daemon=True).start()
+
+    try:
+        # Wait for the worker to start polling before queueing, so its startup (releasing leftover
+        # leases, warming drivers) is not timed and CLEAR_QUEUE_ON_START cannot drop the jobs
+        deadline = time.time() + 60
+        while backend.polls == 0 and time.time() < deadline:
+            time.sleep(0.1)
+
+        started = time.time()
+        for _ in range(args.jobs):
+            backend.queue_job()
+            time.sleep(args.interval)
+
+        with backend.lock:
+            backend.lock.wait_for(backend.done, timeout=args.timeout)
+        elapsed = time.time() - started
+    finally:
+        stop_sampling.set()
+        worker.send_signal(signal.SIGTERM)
+        try:
+            worker.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+        api_server.shutdown()
+        site_server.shutdown()
+
+    jobs = list(backend.jobs.values())
+    finished = [job for job in jobs if job["finishedAt"]]
+    pickup = [job["claimedAt"] - job["queuedAt"] for job in jobs if job["claimedAt"]]
+    job_times = [job["finishedAt"] - job["claimedAt"] for job in finished]
+    case_results = [r for r in backend.results if r.get("environment") == "benchmark"]
+    case_time = sum(r.get("duration", 0) for r in case_results)
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"jobs": args.jobs, "interval": args.interval, "slots": args.slots},
+        "jobsCompleted": len(finished),
+        "jobsFailed": sum(1 for job in finished if job["status"] == "Failed"),
+        "elapsedSeconds": round(elapsed, 2),
+        "jobsPerMinute": round(len(finished) / elapsed * 60, 2) if elapsed else None,
+        "pickupLatency": {"p50": percentile(pickup, 50), "p95": percentile(pickup, 95)},
+        "jobDuration": {"p50": percentile(job_times, 50), "p95": percentile(job_times, 95)},
+        "cases": len(case_results),
+        # Job wall time not spent inside test bodies, spread per case
+        "perCaseOverheadSeconds": round((sum(job_times) - case_time) / len(case_results), 3) if case_results else None,
+        "workerRssMb": {"peak": max(rss_samples) if rss_samples else None,
+                        "mean": round(sum(rss_samples) / len(rss_samples), 1) if rss_samples else None},
+        "backendRequests": {"polls": backend.polls, "heartbeats": backend.heartbeats},
+    }
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    rows = [
+        ("jobsPerMinute", report["jobsPerMinute"], baseline.get("jobsPerMinute")),
+        ("pickup p50", report["pickupLatency"]["p50"], baseline.get("pickupLatency", {}).get("p50")),
+        ("pickup p95", report["pickupLatency"]["p95"], baseline.get("pickupLatency", {}).get("p95")),
+        ("per-case overhead", report["perCaseOverheadSeconds"], baseline.get("perCaseOverheadSeconds")),
+        ("peak RSS MB", report["workerRssMb"]["peak"], baseline.get("workerRssMb", {}).get("peak")),
+    ]
+    print(f"Compared with {baseline_path}:")
+    for name, current, previous in rows:
+        if current is None or previous in (None, 0):
+            print(f"  {name}: {current} (baseline {previous})")
+        else:
+            print(f"  {name}: {current} vs {previous} ({(current - previous) / previous * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the automation worker against a local fake backend.")
+    parser.add_argument("--jobs", type=int, default=10, help="Number of jobs to queue")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between queued jobs")
+    parser.add_argument("--slots", type=int, default=1, help="WORKER_SLOTS for the worker")
+    parser.add_argument("--timeout", type=float, default=600, help="Max seconds to wait for all jobs")
+    parser.add_argument("--output", default=RESULTS_DIR, help="Directory for the JSON report")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show worker output")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    print(f"Report written to {path}")
+    if args.baseline:
+        compare(report, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
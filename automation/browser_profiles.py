@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from selenium.webdriver.chrome.options import Options
+from network_layer import configure_options, block_patterns, release_cache_dir
+
+DEFAULT_PROFILE = os.getenv("BROWSER_PROFILE", "default")
+
+# Named browser profiles, selectable per project (project.browserProfile) or per job (job.browserProfile).
+#   headless                       run without a GUI
+#   block_images / block_fonts     skip downloading images / web fonts
+#   disable_extensions             no extensions, component updates or default apps
+#   disable_background_networking  no sync, safe-browsing or metrics traffic
+#   window_size                    fixed viewport so layouts are reproducible
+#   page_load_strategy             "normal", "eager" (DOMContentLoaded) or "none"
+#   user_data_template             pre-warmed profile dir copied for each session (None = fresh profile)
+#   block_trackers                 block third-party analytics/ads (network_layer.py)
+#   shared_cache                   persistent disk cache reused across sessions and jobs
+#   network_stats                  report requests blocked / bytes saved per test
+BROWSER_PROFILES = {
+    "default": {
+        "headless": os.getenv("HEADLESS", "false").lower() == "true",
+        "page_load_strategy": "normal",
+    },
+    "lean-network": {
+        "headless": os.getenv("HEADLESS", "false").lower() == "true",
+        "page_load_strategy": "normal",
+        "block_trackers": True,
+        "shared_cache": True,
+        "network_stats": True,
+    },
+    "fast-headless": {
+        "headless": True,
+        "block_images": True,
+        "block_fonts": True,
+        "disable_extensions": True,
+        "disable_background_networking": True,
+        "window_size": "1366,768",
+        "page_load_strategy": "eager",
+        "user_data_template": os.getenv("BROWSER_USER_DATA_TEMPLATE"),
+        "block_trackers": True,
+        "shared_cache": True,
+        "network_stats": True,
+    },
+    "full-fidelity": {
+        "headless": False,
+        "window_size": "1920,1080",
+        "page_load_strategy": "normal",
+    },
+}
+
+FONT_URL_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+
+
+def get_profile(name=None):
+    """
+    Returns (name, settings) for a profile, falling back to DEFAULT_PROFILE for unknown names.
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in BROWSER_PROFILES:
+        print(f"Unknown browser profile '{name}'. Using '{DEFAULT_PROFILE}'.")
+        name = DEFAULT_PROFILE
+    return name, BROWSER_PROFILES.get(name, BROWSER_PROFILES["default"])
+
+
+def build_options(settings):
+    """
+    Translates profile settings into Chrome Options.
+    Returns (options, user_data_dir, cache_lease): user_data_dir is a per-session copy of the
+    profile's template (or None) and cache_lease the shared disk-cache slot (or None);
+    both are released by release_driver_resources() when the session ends.
+    """
+    options = Options()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    if settings.get("headless"):
+        options.add_argument("--headless=new")
+    if settings.get("window_size"):
+        options.add_argument(f"--window-size={settings['window_size']}")
+    if settings.get("disable_extensions"):
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-default-apps")
+    if settings.get("disable_background_networking"):
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+        options.add_argument("--metrics-recording-only")
+        options.add_argument("--no-first-run")
+    if settings.get("block_images"):
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = settings.get("page_load_strategy", "normal")
+    cache_lease = configure_options(options, settings)
+
+    user_data_dir = None
+    template = settings.get("user_data_template")
+    if template and os.path.isdir(template):
+        # Copy so parallel sessions never share (and lock) one profile directory
+        user_data_dir = tempfile.mkdtemp(prefix="chrome_profile_")
+        shutil.copytree(template, user_data_dir, dirs_exist_ok=True)
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+
+    return options, user_data_dir, cache_lease
+
+
+def apply_runtime_settings(driver, settings):
+    """
+    Settings that can only be applied once the session exists (CDP).
+    """
+    patterns = []
+    if settings.get("block_fonts"):
+        patterns += FONT_URL_PATTERNS
+    if settings.get("block_trackers"):
+        patterns += block_patterns()
+    if patterns:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            print(f"Could not set blocked URLs: {e}")
+
+
+def release_driver_resources(driver):
+    """
+    Deletes the session's user-data-dir copy and returns its shared cache slot.
+    """
+    path = getattr(driver, "user_data_dir", None)
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+    lease = getattr(driver, "cache_lease", None)
+    if lease is not None:
+        release_cache_dir(lease)
@@ -0,0 +1,189 @@
+import os
+import csv
+import json
+import inspect
+import traceback
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from module_registry import call_entry
+from tracing import current_trace, activate, span
+from result_model import PASSING_STATUSES
+from event_stream import EVENTS, current_context, use_context
+
+DATA_BATCH_SIZE = int(os.getenv("DATA_BATCH_SIZE", "25"))  # Rows run on one session between setup() calls
+DATA_SHARDS = int(os.getenv("DATA_SHARDS", "1"))  # Browser sessions the rows of one case are spread across
+
+
+def dataset_path(source, base_dir):
+    """
+    Path of the dataset file `source`, resolved under `base_dir` (the case's directory).
+    Raises ValueError for paths that leave it: job datasets come from the unauthenticated queue.
+    """
+    root = os.path.realpath(base_dir)
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Dataset '{source}' is outside the case directory")
+    return path
+
+
+def load_dataset(source, base_dir):
+    """
+    Rows of a dataset: a list of objects (inline, e.g. from the job), or a .csv / .json file
+    inside `base_dir`. A JSON file holds a list of objects or {"rows": [...]}.
+    """
+    if isinstance(source, str):
+        path = dataset_path(source, base_dir)
+        with open(path, newline="") as f:
+            if path.lower().endswith(".csv"):
+                return list(csv.DictReader(f))
+            source = json.load(f)
+    if isinstance(source, dict):
+        source = source.get("rows", [])
+    return [row if isinstance(row, dict) else {"value": row} for row in source]
+
+
+def dataset_rows(module, job):
+    """
+    Rows a case module is parametrized with, or None for a plain case.
+    The job's `dataset` applies to single-case jobs; otherwise the module's DATASET is used.
+    """
+    source = job.get('dataset') if job.get('testFilter') and job.get('dataset') else getattr(module, "DATASET", None)
+    if not source:
+        return None
+    return load_dataset(source, os.path.dirname(os.path.abspath(module.__file__)))
+
+
+def row_label(row, index):
+    for key in ("name", "id", "username", "email"):
+        if row.get(key):
+            return str(row[key])
+    return f"row {index + 1}"
+
+
+def _call(func, driver, job, row=None):
+    try:
+        arity = len(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        arity = 1
+    return call_entry(func, arity, driver, job, row)
+
+
+def run_entry(module, func, arity, driver, job, name, retry=None):
+    """
+    Runs a case entry point: once, or once per data row when the module is parametrized (see run_rows).
+    """
+    rows = dataset_rows(module, job)
+    if rows is None:
+        return call_entry(func, arity, driver, job)
+    return run_rows(func, arity, driver, job, rows, name, getattr(module, "setup", None), retry)
+
+
+def run_rows(func, arity, driver, job, rows, name, setup=None, retry=None):
+    """
+    Runs `func` once per row, without a job or a browser start per row.
+    Rows are spread across DATA_SHARDS sessions (the given driver plus new ones with the job's profile);
+    each session runs its rows in batches of DATA_BATCH_SIZE on a warm session: the module's
+    setup(driver, job) (e.g. a login) runs once per batch, then every row reuses its state.
+    Failed rows are retried one by one through `retry`.
+    Returns an aggregate result with one result per row in 'rowResults' (see expand_results).
+    """
+    from driver_manager import fresh_driver
+
+    shard_count = max(1, min(int(job.get('dataShards') or DATA_SHARDS), len(rows)))
+    indexed = list(enumerate(rows))
+    shards = [indexed[i::shard_count] for i in range(shard_count)]
+    trace = current_trace()
+    context = current_context()
+    print(f"[Data] {name}: {len(rows)} rows in batches of {DATA_BATCH_SIZE} across {shard_count} session(s)")
+
+    def run_row(session_driver, index, row):
+        label = row_label(row, index)
+        row_name = f"{name} [{label}]"
+
+        def attempt(attempt_driver):
+            if attempt_driver is not session_driver and setup:
+                _call(setup, attempt_driver, job)  # Fresh retry driver: log in again
+            return call_entry(func, arity, attempt_driver, job, row)
+
+        try:
+            with span("row", case=name, row=label):
+                if retry:
+                    res = retry.run(row_name, attempt, session_driver, job.get('browserProfile'))
+                else:
+                    res = attempt(session_driver)
+        except Exception as e:
+            res = {"status": "FAIL", "message": f"{e}", "errorStack": traceback.format_exc()}
+        if res.get('testName') != row_name:  # Results built by the retry policy are already named
+            res['testName'] = f"{res.get('testName') or name} [{label}]"
+        res['row'] = index
+        EVENTS.emit("case.row", name=name, row=label, status=res['status'])
+        return index, res
+
+    def run_shard(shard_index):
+        activate(trace)
+        use_context(context)
+        results = []
+        try:
+            # Session 0 is the caller's driver; the others get their own, quit when the shard is done
+            with fresh_driver(job.get('browserProfile')) if shard_index else nullcontext(driver) as session_driver:
+                shard_rows = shards[shard_index]
+                for start in range(0, len(shard_rows), DATA_BATCH_SIZE):
+                    batch = shard_rows[start:start + DATA_BATCH_SIZE]
+                    if start:
+                        if shard_index == 0 and job.get('checkpoint'):
+                            job['checkpoint']()  # Higher-priority jobs may run between batches
+                        session_driver.delete_all_cookies()  # Next batch starts from a fresh login
+                    if setup:
+                        try:
+                            with span("row.setup", case=name):
+                                _call(setup, session_driver, job)
+                        except Exception as e:
+                            results.extend((index, {
+                                "testName": f"{name} [{row_label(row, index)}]",
+                                "status": "FAIL",
+                                "message": f"setup() failed for this batch: {e}",
+                                "row": index
+                            }) for index, row in batch)
+                            continue
+                    results.extend(run_row(session_driver, index, row) for index, row in batch)
+        except Exception as e:
+            done = {index for index, _ in results}
+            results.extend((index, {
+                "testName": f"{name} [{row_label(row, index)}]",
+                "status": "FAIL",
+                "message": f"Session {shard_index + 1} failed: {e}",
+                "row": index
+            }) for index, row in shards[shard_index] if index not in done)
+        return results
+
+    if shard_count > 1:
+        with ThreadPoolExecutor(max_workers=shard_count) as executor:
+            collected = [item for shard in executor.map(run_shard, range(shard_count)) for item in shard]
+    else:
+        collected = run_shard(0)
+    row_results = [res for _, res in sorted(collected, key=lambda item: item[0])]
+
+    failed = [res['testName'] for res in row_results if res['status'] not in PASSING_STATUSES]
+    flaky = sum(1 for res in row_results if res['status'] == "FLAKY")
+    message = f"{len(row_results) - len(failed)}/{len(row_results)} rows passed."
+    if failed:
+        message += f" Failed: {failed}"
+    if flaky:
+        message += f" {flaky} flaky (passed on retry)."
+    return {
+        "testName": f"{name} (data-driven)",
+        "status": "FAIL" if failed else "PASS",
+        "message": message,
+        "duration": round(sum(float(res.get('duration') or 0) for res in row_results), 3),
+        "rowResults": row_results
+    }
+
+
+def expand_results(result):
+    """
+    Results to upload for one case: each row's own result, then the aggregate.
+    """
+    if not isinstance(result, dict) or result.get('rowResults') is None:
+        return [result]
+    rows = result.pop('rowResults')
+    return list(rows) + [result]
@@ -0,0 +1,98 @@
+import os
+import time
+import json
+import threading
+
+CASE_HISTORY_FILE = os.getenv("CASE_HISTORY_FILE") or os.path.join(os.path.dirname(__file__), "case_history.json")
+CASE_HISTORY_RUNS = 10  # Durations kept per case
+DEFAULT_CASE_DURATION = 30.0  # Seconds assumed for a case that never ran
+
+_lock = threading.Lock()
+
+
+class CaseHistory:
+    """
+    Local per-case history of one project: recent durations and the last outcome,
+    fed from the results the dispatcher already produces and stored as JSON next to the worker.
+    Used to run failed cases first and to balance shards by expected duration.
+    """
+    def __init__(self, project, path=CASE_HISTORY_FILE):
+        self.project = project
+        self.path = path
+        stored = self._load().get(project, {})
+        self.cases = stored.get("cases", {})
+        self.last_full_run = stored.get("lastFullRun", 0)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[CaseHistory] Ignoring unreadable history {self.path}: {e}")
+            return {}
+
+    def expected_duration(self, case):
+        durations = self.cases.get(case, {}).get("durations")
+        if durations:
+            return sum(durations) / len(durations)
+        known = [sum(c["durations"]) / len(c["durations"]) for c in self.cases.values() if c.get("durations")]
+        return sum(known) / len(known) if known else DEFAULT_CASE_DURATION
+
+    def last_status(self, case):
+        return self.cases.get(case, {}).get("lastStatus")
+
+    def order(self, cases):
+        """
+        Failed last time first, then cases never run, then the rest; shortest first within each group,
+        so a broken build shows up as early as possible.
+        """
+        def key(case):
+            status = self.last_status(case)
+            group = 0 if status and status != "PASS" else 1 if status is None else 2
+            return group, self.expected_duration(case), case
+        return sorted(cases, key=key)
+
+    def pack(self, cases, bins):
+        """
+        Longest-processing-time bin packing: cases sorted by expected duration (longest first),
+        each assigned to the currently lightest shard. Each shard is then run in order().
+        """
+        shards = [[] for _ in range(bins)]
+        loads = [0.0] * bins
+        for case in sorted(cases, key=lambda c: (-self.expected_duration(c), c)):
+            index = loads.index(min(loads))
+            shards[index].append(case)
+            loads[index] += self.expected_duration(case)
+        print(f"[CaseHistory] Expected shard durations: {', '.join(f'{load:.0f}s' for load in loads)}")
+        return [self.order(shard) for shard in shards]
+
+    def record(self, case, status, duration, fingerprint=None):
+        entry = self.cases.setdefault(case, {})
+        entry["lastStatus"] = status
+        entry["durations"] = (entry.get("durations", []) + [round(duration, 3)])[-CASE_HISTORY_RUNS:]
+        if fingerprint:
+            entry["fingerprint"] = fingerprint
+
+    def full_run_due(self, hours):
+        return time.time() - self.last_full_run >= hours * 3600
+
+    def mark_full_run(self):
+        self.last_full_run = time.time()
+
+    def save(self):
+        """
+        Merges this project's cases into the history file. Writes a temp file and renames it,
+        so parallel slots never leave a half-written file behind.
+        """
+        with _lock:
+            data = self._load()
+            data[self.project] = {"cases": self.cases, "lastFullRun": self.last_full_run}
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[CaseHistory] Could not save history: {e}")
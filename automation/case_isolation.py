@@ -0,0 +1,370 @@
+import os
+import sys
+import time
+import signal
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import Future
+
+CASE_ISOLATION = os.getenv("CASE_ISOLATION", "false").lower() == "true"  # Run each case in a supervised child process
+CASE_TIMEOUT = float(os.getenv("CASE_TIMEOUT", "600"))  # Wall-clock seconds per case before its process is killed (0 = no limit)
+CASE_MAX_RSS_MB = int(os.getenv("CASE_MAX_RSS_MB", "2048"))  # Child + chromedriver + Chrome (0 = no limit; needs /proc)
+ISOLATION_POOL_SIZE = int(os.getenv("ISOLATION_POOL_SIZE", "0"))  # Pre-started children kept idle (0 = one per worker slot)
+ISOLATION_MAX_CASES = int(os.getenv("ISOLATION_MAX_CASES", "50"))  # A child is replaced after this many cases
+ISOLATION_CHECK_INTERVAL = 1.0  # Seconds between timeout / memory checks of a running case
+
+
+def process_tree(root_pid):
+    """
+    `root_pid` and all its descendants (e.g. worker or case process + chromedriver + Chrome), from /proc.
+    Returns [root_pid] on platforms without /proc.
+    """
+    if not os.path.isdir("/proc"):
+        return [root_pid]
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def process_tree_rss_mb(root_pid, pids=None):
+    """
+    RSS of a process and all its descendants (or of `pids`, a tree already listed), from /proc.
+    Returns None on platforms without /proc.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    total_kb = 0
+    for pid in pids or process_tree(root_pid):
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def portable_result(result):
+    """
+    Results cross a pipe: a pending screenshot is resolved in the child and raw bytes are copied.
+    """
+    if not hasattr(result, "get"):
+        return result
+    shot = result.get("screenshot")
+    if isinstance(shot, Future):
+        try:
+            shot = shot.result(timeout=30)
+        except Exception as e:
+            print(f"Screenshot encoding failed: {e}")
+            shot = None
+        result["screenshot"] = shot
+    if isinstance(shot, memoryview):
+        result["screenshot"] = bytes(shot)
+    for row_result in result.get("rowResults") or []:
+        portable_result(row_result)
+    return result
+
+
+def _run_task(slot, task):
+    from module_registry import registry
+    from case_data import run_entry
+    from retry_policy import RetryPolicy
+    from network_layer import collect_network_stats
+    from tracing import start_trace
+
+    if task["job"].get("targetUrl"):
+        os.environ["TARGET_URL"] = task["job"]["targetUrl"]
+    search_dir = os.path.dirname(task["path"])
+    if search_dir not in sys.path:
+        sys.path.append(search_dir)  # imports between cases (e.g. login_helper)
+
+    trace = start_trace(f"case-{task['testName']}")
+    try:
+        driver = slot.ensure_driver(task["job"].get("browserProfile"))
+        loaded = registry.load(task["path"], task["module"])
+        entry = loaded.find_entry(task["entry"])
+        if not entry:
+            return {
+                "testName": task["testName"],
+                "status": "FAIL",
+                "message": f"No valid entry function found in {os.path.basename(task['path'])}"
+            }
+        func, arity = entry
+        # Own policy for data rows; a failed case as a whole is retried by the worker
+        result = run_entry(loaded.module, func, arity, driver, task["job"], task["testName"], RetryPolicy())
+        if hasattr(result, "setdefault"):
+            result.setdefault('steps', trace.breakdown())
+            network = collect_network_stats(driver)
+            if network:
+                result.setdefault('network', network)
+        return result
+    except Exception as e:
+        return {
+            "testName": task["testName"],
+            "status": "FAIL",
+            "message": f"{e}",
+            "errorStack": traceback.format_exc()
+        }
+    finally:
+        slot.release()  # Reset the session for the next case, or recycle it
+
+
+def _child_main(conn, index):
+    """
+    Entry point of an isolated case process: starts its own browser session, then runs
+    the cases it is sent, one at a time, until told to stop or the worker goes away.
+    """
+    # Ctrl+C reaches the whole process group: the worker decides when cases stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    import network_layer
+    from driver_manager import DriverSlot
+
+    # Own cache directories: the worker's cache leases are not visible across processes
+    network_layer.NETWORK_CACHE_DIR = os.path.join(network_layer.NETWORK_CACHE_DIR, f"isolated-{index}")
+    slot = DriverSlot(f"isolated-{index}")
+    try:
+        try:
+            slot.ensure_driver()  # Warm session for the default profile before the first case arrives
+        except Exception as e:
+            slot.log(f"Could not pre-start driver: {e}")
+        while True:
+            try:
+                task = conn.recv()
+            except (EOFError, OSError):
+                break
+            if task is None:
+                break
+            result = portable_result(_run_task(slot, task))
+            try:
+                conn.send(result)
+            except Exception as e:
+                conn.send({
+                    "testName": task["testName"],
+                    "status": "FAIL",
+                    "message": f"Result could not be returned from the case process: {e}"
+                })
+    finally:
+        slot.cleanup()
+
+
+class IsolatedProcess:
+    """
+    One pre-started child process with its own WebDriver session.
+    """
+    def __init__(self, context, index):
+        self.index = index
+        self.cases_run = 0
+        self.pids = []  # Process tree seen at the last check: Chrome outlives a crashed child
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_child_main, args=(child_conn, index),
+                                       name=f"isolated-{index}", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        """
+        Forced teardown: the child, its chromedriver and every Chrome process, without asking.
+        """
+        for pid in set(process_tree(self.process.pid) + self.pids):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except (OSError, AttributeError):
+                pass
+        self.process.join(5)
+        self.conn.close()
+
+    def stop(self, timeout=10):
+        """
+        Asks the child to quit its browser and exit; kills it if it does not within `timeout`.
+        """
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class IsolationPool:
+    """
+    Pre-forked pool of case processes. Each case runs in a child with its own browser while the
+    worker supervises it: a case that exceeds CASE_TIMEOUT or whose process tree grows beyond
+    CASE_MAX_RSS_MB is killed together with its browser and reported as FAIL with the reason.
+    Children are replaced after ISOLATION_MAX_CASES cases, so neither leaks in case modules
+    nor a long-lived browser grow the worker over time.
+    Children are forked from a forkserver with the worker's modules preloaded, so replacing
+    one is cheap and never forks the multi-threaded worker itself.
+    """
+    def __init__(self, size=1):
+        self.size = size
+        self.idle = []
+        self.busy = set()
+        self.indices = set()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.context = None
+
+    def _context(self):
+        if self.context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                # The forkserver starts with a bare sys.path: let it find (and preload) the worker's modules
+                worker_dir = os.path.dirname(os.path.abspath(__file__))
+                os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [worker_dir, os.environ.get("PYTHONPATH")]))
+                self.context = multiprocessing.get_context("forkserver")
+                self.context.set_forkserver_preload(["case_isolation", "driver_manager", "module_registry"])
+            else:
+                self.context = multiprocessing.get_context("spawn")
+        return self.context
+
+    def _spawn(self):
+        with self.lock:
+            index = 0
+            while index in self.indices:
+                index += 1
+            self.indices.add(index)
+        return IsolatedProcess(self._context(), index)
+
+    def _retire(self, child, kill=False):
+        if kill:
+            child.kill()
+        else:
+            child.stop()
+        with self.lock:
+            self.indices.discard(child.index)
+
+    def start(self, size=None):
+        """
+        Pre-starts children until `size` are idle.
+        """
+        if size is not None:
+            self.size = size
+        self.closed = False
+        while True:
+            with self.lock:
+                if self.closed or len(self.idle) >= self.size:
+                    return
+            child = self._spawn()
+            with self.lock:
+                self.idle.append(child)
+
+    def acquire(self):
+        with self.lock:
+            while self.idle:
+                child = self.idle.pop()
+                if child.alive():
+                    self.busy.add(child)
+                    return child
+                self.indices.discard(child.index)
+        child = self._spawn()  # All busy (more parallel cases than pre-started children)
+        with self.lock:
+            self.busy.add(child)
+        return child
+
+    def release(self, child, killed=False):
+        with self.lock:
+            self.busy.discard(child)
+            keep = (not killed and not self.closed and child.alive()
+                    and child.cases_run < ISOLATION_MAX_CASES and len(self.idle) < self.size)
+            if keep:
+                self.idle.append(child)
+        if not keep:
+            if child.cases_run >= ISOLATION_MAX_CASES:
+                print(f"[isolated-{child.index}] Served {child.cases_run} cases. Replacing process...")
+            self._retire(child, kill=killed or not child.alive())
+            if not self.closed:
+                self.start()  # Replacement is ready before the next case needs it
+
+    def run(self, task, timeout=CASE_TIMEOUT, max_rss_mb=CASE_MAX_RSS_MB):
+        """
+        Runs one case in a child and waits for its result, enforcing the wall-clock and memory limits.
+        """
+        child = self.acquire()
+        started = time.time()
+        reason = None
+        try:
+            child.conn.send(task)
+            while True:
+                if child.conn.poll(ISOLATION_CHECK_INTERVAL):
+                    result = child.conn.recv()
+                    child.cases_run += 1
+                    self.release(child)
+                    return result
+                elapsed = time.time() - started
+                if not child.alive():
+                    reason = f"Case process exited unexpectedly (exit code {child.process.exitcode})"
+                    break
+                if timeout and elapsed > timeout:
+                    reason = f"Case killed: exceeded the {timeout:.0f}s timeout"
+                    break
+                child.pids = process_tree(child.process.pid)
+                rss = process_tree_rss_mb(child.process.pid, child.pids) if max_rss_mb else None
+                if rss is not None and rss > max_rss_mb:
+                    reason = f"Case killed: its processes used {rss:.0f} MB (limit {max_rss_mb} MB)"
+                    break
+        except (EOFError, OSError):
+            child.process.join(1)
+            reason = f"Case process exited unexpectedly (exit code {child.process.exitcode})"
+
+        from event_stream import EVENTS
+
+        print(f"[isolated-{child.index}] {reason}. Tearing down its browser...")
+        EVENTS.emit("case.killed", name=task["testName"], reason=reason)
+        self.release(child, killed=True)
+        return {
+            "testName": task["testName"],
+            "status": "FAIL",
+            "message": f"{reason} after {time.time() - started:.1f}s.",
+            "duration": round(time.time() - started, 3)
+        }
+
+    def shutdown(self):
+        """
+        Stops idle children and kills any still running a case.
+        """
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            busy = list(self.busy)
+        for child in idle:
+            self._retire(child)
+        for child in busy:
+            child.kill()
+
+
+POOL = IsolationPool()
+
+
+def run_isolated(path, module_name, entry_name, job, test_name):
+    """
+    Runs the entry point `entry_name` of the module at `path` in a pooled case process.
+    Only plain job fields are sent (no callbacks, no retry policy).
+    """
+    job_data = {key: value for key, value in job.items()
+                if isinstance(value, (str, int, float, bool, list, dict, type(None)))}
+    task = {"path": os.path.abspath(path), "module": module_name, "entry": entry_name,
+            "job": job_data, "testName": test_name}
+    return POOL.run(task)
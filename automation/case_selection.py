@@ -0,0 +1,115 @@
+import os
+import ast
+import hashlib
+import requests
+from backend_client import get_client
+from case_data import dataset_path
+
+SUITE_SELECTION = os.getenv("SUITE_SELECTION", "all")  # "all" or "changed" (changed or last-failed cases only)
+SUITE_FULL_RUN_HOURS = float(os.getenv("SUITE_FULL_RUN_HOURS", "168"))  # A full run is forced at least this often
+# Response headers of the target app that identify its deployed build (first one present wins).
+# Not ETag: dynamic pages send a new one per response, which would turn every "changed" run into a full run
+BUILD_ID_HEADERS = [h.strip() for h in os.getenv("BUILD_ID_HEADERS", "X-Build-Id,X-App-Version,X-Version").split(",") if h.strip()]
+
+
+def local_imports(path, search_dirs):
+    """
+    Files in `search_dirs` imported by the module at `path`
+    (e.g. login_helper.py from the cases dir, base_page.py from the worker).
+    """
+    try:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError):
+        return []
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level <= 1:
+            names.add(node.module)
+    files = []
+    for name in sorted(names):
+        for search_dir in search_dirs:
+            candidate = os.path.join(search_dir, name.replace(".", os.sep) + ".py")
+            if os.path.exists(candidate):
+                files.append(os.path.abspath(candidate))
+                break
+    return files
+
+
+def dataset_file(path):
+    """
+    Data file named by a module-level `DATASET = "rows.csv"` in the module at `path`, or None.
+    """
+    try:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError):
+        return None
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "DATASET" for target in node.targets)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            try:
+                candidate = dataset_path(node.value.value, os.path.dirname(os.path.abspath(path)))
+            except ValueError:
+                return None
+            return candidate if os.path.exists(candidate) else None
+    return None
+
+
+def fingerprint_case(path, search_dirs, build_id=None):
+    """
+    Hash of a case module, every local helper it imports (transitively), its dataset file
+    and the target build id. Changes whenever anything the case depends on changes.
+    """
+    digest = hashlib.sha256()
+    seen, pending = set(), [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        pending.extend(local_imports(current, search_dirs))
+    data_file = dataset_file(path)
+    if data_file:
+        seen.add(data_file)
+    for file_path in sorted(seen):
+        digest.update(os.path.basename(file_path).encode())
+        with open(file_path, "rb") as f:
+            digest.update(f.read())
+    digest.update((build_id or "").encode())
+    return digest.hexdigest()[:16]
+
+
+def build_identifier(base_url):
+    """
+    Build id exposed by the target app in a response header, or None if it exposes none.
+    Uses the shared client's session so the HEAD reuses its pooled connections.
+    """
+    if not base_url:
+        return None
+    try:
+        resp = get_client().session.head(base_url, timeout=5, allow_redirects=True)
+    except requests.RequestException as e:
+        print(f"[CaseSelection] Could not read build id from {base_url}: {e}")
+        return None
+    for header in BUILD_ID_HEADERS:
+        if resp.headers.get(header):
+            return f"{header}:{resp.headers[header]}"
+    return None
+
+
+def select_changed(history, cases, fingerprints):
+    """
+    Splits `cases` into (selected, skipped): a case is rerun when it never ran, failed last time
+    or its fingerprint changed.
+    """
+    selected, skipped = [], []
+    for case in cases:
+        entry = history.cases.get(case, {})
+        if entry.get("lastStatus") != "PASS" or entry.get("fingerprint") != fingerprints[case]:
+            selected.append(case)
+        else:
+            skipped.append(case)
+    return selected, skipped
@@ -0,0 +1,169 @@
+import os
+from contextlib import contextmanager
+from utils import create_driver
+from browser_profiles import get_profile, release_driver_resources
+from tracing import span
+from case_isolation import process_tree_rss_mb
+
+# Driver lifecycle settings
+DRIVER_REUSE = os.getenv("DRIVER_REUSE", "true").lower() == "true"  # false = quit driver after every job
+DRIVER_MAX_JOBS = int(os.getenv("DRIVER_MAX_JOBS", "25"))  # Recycle session after N jobs
+DRIVER_MAX_MEMORY_GROWTH_MB = int(os.getenv("DRIVER_MAX_MEMORY_GROWTH_MB", "300"))  # Recycle when chromedriver + Chrome RSS grew this much
+
+
+@contextmanager
+def fresh_driver(profile):
+    """
+    A new browser session with `profile` for the caller's block, quit and released afterwards.
+    Used for extra shard sessions and fresh-driver retries; the runner's warm drivers live in DriverSlot.
+    """
+    with span("driver.create"):
+        driver = create_driver(profile)
+    try:
+        yield driver
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        release_driver_resources(driver)
+
+
+class DriverSlot:
+    """
+    One independent WebDriver session.
+    Every slot owns its own driver so parallel jobs never share browser state.
+    With DRIVER_REUSE enabled the session is kept warm between jobs: state is reset
+    after each job and the session is health-checked before it is handed out again.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.driver = None
+        self.status = "idle"
+        self.jobs_run = 0
+        self.baseline_memory = None
+
+    def log(self, message):
+        print(f"[{self.name}] {message}")
+
+    def set_status(self, status):
+        self.status = status
+        self.log(f"Status: {status}")
+
+    def ensure_driver(self, profile=None):
+        profile_name, _ = get_profile(profile)
+        if self.driver and getattr(self.driver, "profile_name", None) != profile_name:
+            self.log(f"Job needs browser profile '{profile_name}'. Recycling warm driver...")
+            self.cleanup()
+        if self.driver:
+            with span("driver.healthcheck"):
+                healthy = self.is_healthy()
+            if not healthy:
+                self.log("Warm driver failed health check. Recycling...")
+                self.cleanup()
+        if not self.driver:
+            with span("driver.create"):
+                self.driver = create_driver(profile_name)
+            self.jobs_run = 0
+            self.baseline_memory = self.memory_usage_mb()
+        else:
+            self.log(f"Reusing warm driver (jobs run: {self.jobs_run})")
+        return self.driver
+
+    def release(self):
+        """
+        Called at the end of every job. Either resets the session for the next job
+        or quits it (reuse disabled, job limit reached, memory grew too much, reset failed).
+        """
+        if not self.driver:
+            return
+        self.jobs_run += 1
+
+        if not DRIVER_REUSE:
+            self.cleanup()
+            return
+
+        if self.jobs_run >= DRIVER_MAX_JOBS:
+            self.log(f"Driver served {self.jobs_run} jobs. Recycling...")
+            self.cleanup()
+            return
+
+        with span("driver.reset"):
+            reset = self.reset_state()
+        if not reset:
+            self.cleanup()
+            return
+
+        # Measured on about:blank after the reset, like the baseline of the fresh session
+        memory = self.memory_usage_mb()
+        if memory is not None and self.baseline_memory is not None:
+            growth = memory - self.baseline_memory
+            if growth > DRIVER_MAX_MEMORY_GROWTH_MB:
+                self.log(f"Driver memory grew by {growth:.0f} MB. Recycling...")
+                self.cleanup()
+
+    def reset_state(self):
+        """
+        Clears cookies, local/session storage and extra tabs so the next job starts clean.
+        """
+        driver = self.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                origin = driver.execute_script(
+                    "window.localStorage.clear(); window.sessionStorage.clear(); return window.location.origin;"
+                )
+            except Exception:
+                origin = None  # about:blank / data: pages have no storage
+
+            try:
+                # Clears cookies for every domain, not only the current one
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                if origin and origin != "null":
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                        "origin": origin,
+                        "storageTypes": "indexeddb,service_workers,cache_storage",
+                    })
+            except Exception:
+                driver.delete_all_cookies()
+
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            self.log(f"Failed to reset driver state: {e}")
+            return False
+
+    def is_healthy(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def memory_usage_mb(self):
+        """
+        RSS of the session's chromedriver and every Chrome process it started.
+        None for remote drivers or platforms without /proc.
+        """
+        try:
+            return process_tree_rss_mb(self.driver.service.process.pid)
+        except AttributeError:
+            return None
+
+    def cleanup(self):
+        if self.driver:
+            self.log("Closing driver via cleanup...")
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self.log(f"Error closing driver: {e}")
+            finally:
+                release_driver_resources(self.driver)
+                self.driver = None
+                self.jobs_run = 0
+                self.baseline_memory = None
@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+import tracing
+
+EVENT_STREAM = os.getenv("EVENT_STREAM", "true").lower() == "true"
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "5000"))  # Ring buffer: oldest events are dropped when full
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "200"))  # Events per frame
+EVENT_FLUSH_INTERVAL = float(os.getenv("EVENT_FLUSH_INTERVAL", "0.5"))  # Seconds between frames
+
+# Span name -> event kind; other spans are reported as "step"
+SPAN_KINDS = {"wait": "wait", "screenshot.capture": "screenshot"}
+# Spans that already have explicit started/finished events, or that run outside any job
+SKIPPED_SPANS = {"job", "test", "case", "screenshot.encode"}
+
+_local = threading.local()
+
+
+def current_context():
+    return getattr(_local, "context", None)
+
+
+def use_context(context):
+    """
+    Tags events emitted by this thread with `context` (e.g. shard threads of a suite).
+    """
+    _local.context = context
+
+
+@contextmanager
+def job_context(job_id, slot=None):
+    previous = current_context()
+    _local.context = {"jobId": job_id, "slot": slot}
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+class EventStream:
+    """
+    Streams structured progress events and log lines of running jobs to the backend.
+    emit() never blocks: events go into a bounded ring buffer (oldest dropped and counted when
+    the backend cannot keep up), and the worker's event task sends them in small batched frames
+    over one keep-alive connection.
+    """
+    def __init__(self, size=EVENT_BUFFER_SIZE, batch_size=EVENT_BATCH_SIZE):
+        self.buffer = deque(maxlen=size)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.dropped = 0
+        self.enabled = EVENT_STREAM
+        self.client = None
+
+    def emit(self, kind, **data):
+        self.record(kind, data)
+
+    def record(self, kind, data, context=None):
+        context = context or current_context()
+        if not self.enabled or context is None:
+            return
+        with self.lock:
+            self.seq += 1
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append({"seq": self.seq, "ts": time.time(), "kind": kind,
+                                "jobId": context["jobId"], "slot": context.get("slot"), "data": data})
+
+    def pending(self):
+        return len(self.buffer)
+
+    def take(self):
+        with self.lock:
+            count = min(self.batch_size, len(self.buffer))
+            events = [self.buffer.popleft() for _ in range(count)]
+            dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+    def requeue(self, events, dropped):
+        """
+        Puts an unsent frame back in front of newer events, as far as the buffer has room.
+        """
+        with self.lock:
+            room = self.buffer.maxlen - len(self.buffer)
+            kept = events[-room:] if room else []
+            self.buffer.extendleft(reversed(kept))
+            self.dropped += dropped + len(events) - len(kept)
+
+    def send_pending(self, worker_id):
+        """
+        Sends buffered events frame by frame. Returns False when the backend is unreachable;
+        unsent events stay buffered for the next call.
+        """
+        from backend_client import BackendClient
+
+        if self.client is None:
+            self.client = BackendClient(pool_size=1, retries=0)  # One persistent connection
+        while self.enabled and self.buffer:
+            events, dropped = self.take()
+            try:
+                # default=str: span attributes are not guaranteed to be JSON types
+                body = json.dumps({"workerId": worker_id, "dropped": dropped, "events": events}, default=str)
+                resp = self.client.post("/jobs/events", data=body, headers={"Content-Type": "application/json"}, timeout=5)
+            except Exception as e:
+                self.requeue(events, dropped)
+                print(f"Event stream paused: {e}", file=sys.__stdout__)
+                return False
+            if resp.status_code in (404, 405):
+                print("Backend does not accept live events. Event streaming disabled.", file=sys.__stdout__)
+                self.enabled = False
+                self.buffer.clear()
+            elif resp.status_code >= 400:
+                self.requeue(events, dropped)
+                return False
+        return True
+
+
+class LogTee:
+    """
+    stdout wrapper: writes through to the console and turns complete lines printed while
+    a job runs into "log" events. Carriage-return status lines are console-only.
+    """
+    def __init__(self, stream, events):
+        self.stream = stream
+        self.events = events
+        self.partial = threading.local()
+
+    def write(self, text):
+        written = self.stream.write(text)
+        if current_context() is not None:
+            pending = getattr(self.partial, "text", "") + text
+            *lines, rest = pending.split("\n")
+            for line in lines:
+                line = line.rsplit("\r", 1)[-1]
+                if line.strip():
+                    self.events.emit("log", line=line)
+            self.partial.text = "" if "\r" in rest else rest
+        return written
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+EVENTS = EventStream()
+
+
+def _span_listener(name, duration, attrs):
+    if name not in SKIPPED_SPANS:
+        EVENTS.record(SPAN_KINDS.get(name, "step"), dict(attrs, name=name, duration=round(duration, 3)))
+
+
+def install():
+    """
+    Starts capturing: span ends become step/wait/screenshot events and printed lines become log events.
+    """
+    if not EVENTS.enabled:
+        return
+    tracing.add_listener(_span_listener)
+    if not isinstance(sys.stdout, LogTee):
+        sys.stdout = LogTee(sys.stdout, EVENTS)
@@ -0,0 +1,124 @@
+import os
+import uuid
+import socket
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process keeps its own ID
+    fcntl = None
+from backend_client import get_client
+
+LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))  # Job is requeued if the lease is not renewed in time
+WORKER_ID_FILE = os.path.join(os.path.dirname(__file__), ".worker_id")
+PROJECTS_DIR = os.path.join(os.path.dirname(__file__), "projects")
+
+
+# Unique per process until claim_worker_id() adopts the persisted id (WORKER_ID env always wins)
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+_worker_id_file = None  # Held open (and locked) for the life of the process once claimed
+
+
+def claim_worker_id():
+    """
+    Adopts the worker ID persisted in automation/.worker_id (writing this process's ID there the first time),
+    so a restarted worker can recover (release) the jobs it held before a crash.
+    The file stays locked while the process runs: a second worker started from the same checkout
+    cannot claim it and keeps its own per-process ID. Called from the worker's main(), never at import.
+    """
+    global WORKER_ID, _worker_id_file
+    if os.getenv("WORKER_ID") or _worker_id_file or fcntl is None:
+        return WORKER_ID
+    f = open(WORKER_ID_FILE, "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        print(f"  {WORKER_ID_FILE} is held by another worker. Using a per-process ID.")
+        return WORKER_ID
+    f.seek(0)
+    worker_id = f.read().strip()
+    if worker_id:
+        WORKER_ID = worker_id
+    else:
+        f.write(WORKER_ID)
+        f.flush()
+    _worker_id_file = f
+    return WORKER_ID
+
+
+def local_projects():
+    """
+    Project directories this worker can run (those with a tests.py).
+    """
+    if not os.path.isdir(PROJECTS_DIR):
+        return []
+    return sorted(name for name in os.listdir(PROJECTS_DIR) if os.path.exists(os.path.join(PROJECTS_DIR, name, "tests.py")))
+
+
+def capacity(slots):
+    return {
+        "workerId": WORKER_ID,
+        "hostname": socket.gethostname(),
+        "totalSlots": len(slots),
+        "freeSlots": sum(1 for slot in slots if slot.status == "idle"),
+        "browsers": ["chrome"],
+        "projects": local_projects(),
+    }
+
+
+def release_own_jobs():
+    """
+    Requeues jobs still marked Processing under this worker's ID (left over from a crash).
+    Jobs held by other workers are never touched.
+    """
+    try:
+        resp = get_client().post("/jobs/release", json={"workerId": WORKER_ID}, idempotent=True)
+        if resp.status_code == 200:
+            released = (resp.json().get("data") or {}).get("released", 0)
+            print(f"  Released {released} job(s) previously held by {WORKER_ID}.")
+            return True
+        print(f"  Backend does not support job release (HTTP {resp.status_code}).")
+    except Exception as e:
+        print(f"  Warning: Failed to release own jobs: {e}")
+    return False
+
+
+class LeaseKeeper:
+    """
+    Tracks the leases of the jobs this worker holds; renew_all() is called every RENEW_INTERVAL.
+    If a renewal is refused the lease was lost (e.g. the worker stalled past its lease and the
+    job was requeued to another worker). Renewals for it stop and the backend rejects its final status.
+    """
+    RENEW_INTERVAL = max(LEASE_SECONDS / 3, 1)
+
+    def __init__(self):
+        self.jobs = {}  # job id -> lost flag
+        self.lock = threading.Lock()
+
+    def add(self, job_id):
+        with self.lock:
+            self.jobs[job_id] = False
+
+    def remove(self, job_id):
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def renew_all(self):
+        with self.lock:
+            job_ids = [job_id for job_id, lost in self.jobs.items() if not lost]
+        for job_id in job_ids:
+            self.renew(job_id)
+
+    def renew(self, job_id):
+        try:
+            resp = get_client().post("/jobs/renew-lease", json={
+                "id": job_id, "workerId": WORKER_ID, "leaseSeconds": LEASE_SECONDS,
+            }, idempotent=True)
+        except Exception as e:
+            print(f"Lease renewal for job {job_id} failed: {e}")
+            return
+        if resp.status_code == 409:
+            print(f"Lost lease on job {job_id}. It may have been requeued to another worker.")
+            with self.lock:
+                if job_id in self.jobs:
+                    self.jobs[job_id] = True
@@ -0,0 +1,123 @@
+import os
+import threading
+
+# Priority classes, same values as the backend (models.Priority*): higher runs first
+PRIORITY_NIGHTLY = 1
+PRIORITY_SUITE = 2
+PRIORITY_INTERACTIVE = 3
+
+JOB_PREFETCH = int(os.getenv("JOB_PREFETCH", "0"))  # Jobs held locally on top of the idle slots (0 in a fleet: held jobs wait while other workers idle)
+JOB_PREEMPTION = os.getenv("JOB_PREEMPTION", "true").lower() == "true"
+
+
+def job_priority(job):
+    """
+    Priority class of a job. Jobs from a backend without priorities are classed like the
+    backend would: a single case is interactive, anything else a suite.
+    """
+    priority = job.get('priority')
+    if priority:
+        return int(priority)
+    return PRIORITY_INTERACTIVE if job.get('testFilter') else PRIORITY_SUITE
+
+
+class JobScheduler:
+    """
+    Local scheduler over a prefetched batch of jobs.
+    The worker's intake task calls intake_once() in a loop to keep up to (idle slots + JOB_PREFETCH) leased jobs in a local queue;
+    slots take the most urgent one: highest priority class first, then the project served
+    least recently (so one project's backlog cannot starve another), then arrival order.
+    While every slot is busy only interactive jobs are claimed, and only as many as there are
+    running lower-priority jobs to preempt, so other jobs stay on the backend for idle workers
+    of the fleet; running suites call take_preempting() between cases, so an interactive job
+    runs on their slot instead of waiting for the whole suite.
+    """
+    def __init__(self, fetch, slots, poller, on_claim=None):
+        self.fetch = fetch  # fetch(limit, min_priority) -> list of claimed jobs (may block while long-polling)
+        self.slots = slots
+        self.poller = poller
+        self.on_claim = on_claim
+        self.queue = []
+        self.sequence = 0
+        self.last_served = {}  # project id -> sequence number of its last started job
+        self.running = {}  # slot name -> jobs started on it (a preempting job on top of the paused one)
+        self.cond = threading.Condition()
+
+    def demand(self):
+        """
+        (limit, min_priority) for the next fetch. limit is 0 when nothing should be claimed.
+        """
+        with self.cond:
+            free = sum(1 for slot in self.slots if slot.status == "idle")
+            if free > len(self.queue):
+                return free + JOB_PREFETCH - len(self.queue), 0
+            if JOB_PREEMPTION:
+                preemptible = sum(1 for jobs in self.running.values() if jobs and job_priority(jobs[-1]) < PRIORITY_INTERACTIVE)
+                waiting = sum(1 for job in self.queue if job_priority(job) >= PRIORITY_INTERACTIVE)
+                if preemptible > waiting:
+                    return 1, PRIORITY_INTERACTIVE
+            return 0, 0
+
+    def intake_once(self):
+        """
+        One fetch for the local queue (blocks while long-polling). Returns False when nothing
+        was wanted, so the caller can pause before asking again.
+        """
+        limit, min_priority = self.demand()
+        if limit <= 0:
+            # Nothing to claim: not polling, so the heartbeat must keep the worker online
+            self.poller.long_poll = False
+            return False
+        jobs = self.fetch(limit, min_priority)
+        if jobs:
+            self.add(jobs)
+        return True
+
+    def add(self, jobs):
+        with self.cond:
+            for job in jobs:
+                if self.on_claim:
+                    self.on_claim(job)
+                self.sequence += 1
+                job['_arrival'] = self.sequence
+                self.queue.append(job)
+                print(f"Queued job {job['id']} locally (priority {job_priority(job)}, {len(self.queue)} waiting)")
+            self.cond.notify_all()
+
+    def _pick(self, min_priority=0, slot=None):
+        candidates = [job for job in self.queue if job_priority(job) > min_priority]
+        if not candidates:
+            return None
+        job = min(candidates, key=lambda j: (-job_priority(j), self.last_served.get(j.get('projectId'), 0), j['_arrival']))
+        self.queue.remove(job)
+        self.sequence += 1
+        self.last_served[job.get('projectId')] = self.sequence
+        job.pop('_arrival', None)
+        if slot is not None:
+            self.running.setdefault(slot.name, []).append(job)
+        return job
+
+    def next_job(self, timeout=1, slot=None):
+        """
+        Most urgent local job, or None when none arrived within `timeout`.
+        With a `slot` the job counts as running on it until finished() is called.
+        """
+        with self.cond:
+            if not self.queue:
+                self.cond.wait(timeout)
+            return self._pick(slot=slot)
+
+    def take_preempting(self, running_job, slot=None):
+        """
+        A queued job of a strictly higher priority class than `running_job`, if any.
+        """
+        if not JOB_PREEMPTION:
+            return None
+        with self.cond:
+            return self._pick(min_priority=job_priority(running_job), slot=slot)
+
+    def finished(self, slot, job):
+        with self.cond:
+            jobs = self.running.get(slot.name)
+            if jobs and jobs[-1] is job:
+                jobs.pop()
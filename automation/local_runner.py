@@ -1,58 +1,132 @@
 import os
 import sys
 import time
-import requests
 import atexit
 import signal
+import asyncio
+import threading
 import traceback
-import importlib.util
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from driver_manager import DriverSlot
+from module_registry import registry, call_entry
+from tracing import start_trace, end_trace, current_trace, activate, span
+from network_layer import collect_network_stats, merge_stats
+from backend_client import BACKEND_URL, ResultBatcher, get_client, in_background, set_background
+from fleet import WORKER_ID, LEASE_SECONDS, LeaseKeeper, capacity, claim_worker_id, release_own_jobs
+from job_scheduler import JobScheduler
+from result_model import PASSING_STATUSES
+from retry_policy import RetryPolicy
+from case_data import run_entry, expand_results
+from case_isolation import CASE_ISOLATION, ISOLATION_POOL_SIZE, POOL as ISOLATION_POOL, run_isolated
+from event_stream import EVENTS, EVENT_FLUSH_INTERVAL, job_context, install as install_event_stream
 
 # Load Env
 load_dotenv()
 
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000/api")
-POLL_INTERVAL = 10  # Seconds
-DRIVER_INSTANCE = None
+POLL_INTERVAL = 10  # Seconds, upper bound of the fallback backoff
+MIN_POLL_INTERVAL = 1  # Seconds, first backoff step
+LONG_POLL_TIMEOUT = int(os.getenv("LONG_POLL_TIMEOUT", "20"))  # Seconds the backend may hold /jobs/next (0 = plain polling)
+BUSY_LONG_POLL_TIMEOUT = min(LONG_POLL_TIMEOUT, 5)  # Shorter hold while all slots are busy, so a freed slot is noticed quickly
+WORKER_SLOTS = max(1, int(os.getenv("WORKER_SLOTS", "1")))  # Parallel browser sessions
+HEARTBEAT_MAX_SILENCE = 60  # Seconds; capacity is re-sent at least this often, even while long-polling
+CLEAR_QUEUE_ON_START = os.getenv("CLEAR_QUEUE_ON_START", "false").lower() == "true"
+DRAIN_TIMEOUT = int(os.getenv("WORKER_DRAIN_TIMEOUT", "120"))  # Seconds running jobs may finish after a shutdown signal
+UPLOAD_DRAIN_TIMEOUT = 60  # Seconds pending uploads may take during shutdown
+
+SHUTDOWN_EVENT = threading.Event()
+LEASES = LeaseKeeper()
+
+
+MAIN_SLOT = DriverSlot("main")
+SLOTS = [MAIN_SLOT]
 
 def cleanup_driver():
-    global DRIVER_INSTANCE
-    if DRIVER_INSTANCE:
-        print("Closing driver via cleanup...")
-        try:
-            DRIVER_INSTANCE.quit()
-        except Exception as e:
-            print(f"Error closing driver: {e}")
-        finally:
-            DRIVER_INSTANCE = None
+    for slot in SLOTS:
+        slot.cleanup()
+    ISOLATION_POOL.shutdown()
 
 def signal_handler(sig, frame):
     print(f"Received signal {sig}. Cleaning up...")
+    SHUTDOWN_EVENT.set()
     cleanup_driver()
+    release_own_jobs()  # Hand prefetched and interrupted jobs back to the fleet right away
     sys.exit(0)
 
 atexit.register(cleanup_driver)
 signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
 
-def get_next_job():
+def get_next_job(wait=0, limit=0, min_priority=0):
+    """
+    Claims up to `limit` jobs (1 when 0) leased to this worker. Returns a list, empty when none is pending.
+    """
     try:
-        resp = requests.get(f"{BACKEND_URL}/jobs/next")
+        params = {"workerId": WORKER_ID, "leaseSeconds": LEASE_SECONDS}
+        if wait:
+            params["wait"] = wait
+        if limit:
+            params["limit"] = limit
+        if min_priority:
+            params["minPriority"] = min_priority
+        # No client-side retries here: JobPoller owns the backoff
+        resp = get_client().get("/jobs/next", params=params, timeout=(3.05, wait + 10), retries=0)
         if resp.status_code == 200:
             data = resp.json()
             if data.get('success') and data.get('data'):
-                return data['data']
+                jobs = data['data']
+                # Backends without prefetch support ignore `limit` and return a single job
+                return [jobs] if isinstance(jobs, dict) else jobs
         elif resp.status_code == 204:
-            return None
+            return []
     except Exception as e:
         print(f"Error polling backend: {e}")
-    return None
+    return []
+
+class JobPoller:
+    """
+    Job intake with low pickup latency.
+    Uses long-poll (GET /jobs/next?wait=N) so a queued job is delivered as soon as it arrives.
+    When the backend answers immediately instead (older backend without long-poll, or an error),
+    falls back to exponential backoff between MIN_POLL_INTERVAL and POLL_INTERVAL.
+    """
+    def __init__(self):
+        self.delay = MIN_POLL_INTERVAL
+        self.long_poll = False
+
+    def next_jobs(self, limit=1, min_priority=0):
+        wait = BUSY_LONG_POLL_TIMEOUT if min_priority else LONG_POLL_TIMEOUT
+        started = time.time()
+        jobs = get_next_job(wait=wait, limit=limit, min_priority=min_priority)
+        if jobs:
+            self.delay = MIN_POLL_INTERVAL
+            return jobs
+
+        if wait and time.time() - started >= MIN_POLL_INTERVAL:
+            # Backend held the request: it already waited for us, poll again right away
+            self.long_poll = True
+            self.delay = MIN_POLL_INTERVAL
+            return []
+
+        self.long_poll = False
+        SHUTDOWN_EVENT.wait(self.delay)
+        self.delay = min(self.delay * 2, POLL_INTERVAL)
+        return []
+
+POLLER = JobPoller()
+SCHEDULER = JobScheduler(POLLER.next_jobs, SLOTS, POLLER, on_claim=lambda job: LEASES.add(job['id']))
+
+def send_heartbeat(payload):
+    try: get_client().post("/worker-heartbeat", json=payload, timeout=2, retries=0)
+    except: pass
 
 def update_job_status(job_id, status):
+    EVENTS.record("job.status", {"status": status}, context={"jobId": job_id})
     try:
-        requests.post(f"{BACKEND_URL}/jobs/update-status", json={"id": job_id, "status": status})
+        resp = get_client().post("/jobs/update-status", json={"id": job_id, "status": status, "workerId": WORKER_ID},
+                                  idempotent=True)
+        if resp.status_code == 409:
+            print(f"Job {job_id} is no longer leased to {WORKER_ID}. Status '{status}' was not recorded.")
     except Exception as e:
         print(f"Error updating job status: {e}")
 
@@ -60,7 +134,7 @@ def get_project_details(project_id):
     if not project_id:
         return None
     try:
-        resp = requests.get(f"{BACKEND_URL}/projects/{project_id}")
+        resp = get_client().get(f"/projects/{project_id}")
         if resp.status_code == 200:
             data = resp.json()
             if data.get('success'):
@@ -79,16 +153,50 @@ def load_project_module(project_slug):
         print(f"No test script found at {project_path}")
         return None
     
-    spec = importlib.util.spec_from_file_location(f"projects.{project_slug}.tests", project_path)
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = module
-    spec.loader.exec_module(module)
-    return module
-
-def run_job(job):
-    global DRIVER_INSTANCE
-    
-    print(f"Processing Job {job['id']}...")
+    # Cached: tests.py is only re-executed when the file changed since the last job
+    with span("module.load", project=project_slug):
+        return registry.load(project_path, f"projects.{project_slug}.tests")
+
+def run_job(job, slot=None, preempting=False):
+    """
+    Runs one job under a trace so every phase (project lookup, module load, driver,
+    tests, upload) is timed. The trace is exported when TRACE_EXPORT is set.
+    With `preempting`, the job runs inside a paused job's slot (see preempt()).
+    """
+    slot = slot or MAIN_SLOT
+    start_trace(f"job-{job['id']}")
+    LEASES.add(job['id'])
+    try:
+        with job_context(job['id'], slot.name), span("job", jobId=job['id']):
+            EVENTS.emit("job.started", preempting=preempting)
+            execute_job(job, slot, preempting)
+    finally:
+        # Queued behind the job's final upload and status update, so the lease outlives them
+        in_background(LEASES.remove, job['id'])
+        SCHEDULER.finished(slot, job)
+        end_trace()
+        if not preempting and slot.status != "idle":
+            slot.set_status("idle")
+
+def preempt(running_job, slot):
+    """
+    Checkpoint between the cases of a running job: queued jobs of a higher priority class
+    run first on the same slot and driver, then the paused job resumes.
+    """
+    urgent = SCHEDULER.take_preempting(running_job, slot)
+    if not urgent:
+        return
+    paused_trace = current_trace()
+    while urgent:
+        slot.log(f"Pausing job {running_job['id']} for higher-priority job {urgent['id']}")
+        run_job(urgent, slot, preempting=True)
+        urgent = SCHEDULER.take_preempting(running_job, slot)
+    activate(paused_trace)
+    slot.set_status(f"resuming job {running_job['id']}")
+
+def execute_job(job, slot, preempting=False):
+
+    print(f"[{slot.name}] Processing Job {job['id']}...")
     print(f"DEBUG JOB CONTENT: {job}")
     
     # 1. Identify Project
@@ -98,7 +206,8 @@ def run_job(job):
         update_job_status(job['id'], "Failed")
         return
 
-    project = get_project_details(project_id)
+    with span("project.fetch"):
+        project = get_project_details(project_id)
     if not project:
         print(f"Project {project_id} not found.")
         update_job_status(job['id'], "Failed")
@@ -112,9 +221,11 @@ def run_job(job):
     print(f"Project: {project['name']} -> Slug: {project_slug}")
 
     # Inject TARGET_URL into Environment for the test
+    # (also kept on the job, since env vars are shared between parallel slots)
     if project.get('baseUrl'):
         print(f"Setting TARGET_URL = {project['baseUrl']}")
         os.environ["TARGET_URL"] = project['baseUrl']
+        job['targetUrl'] = project['baseUrl']
 
     # 2. Load Script
     module = load_project_module(project_slug)
@@ -136,22 +247,26 @@ def run_job(job):
         update_job_status(job['id'], "Failed")
         return
 
-    # 3. Initialize Driver
-    if not DRIVER_INSTANCE:
+    # 3. Initialize Driver (job profile > project profile > BROWSER_PROFILE)
+    job['browserProfile'] = job.get('browserProfile') or project.get('browserProfile')
+    if CASE_ISOLATION:
+        driver = None  # Every case starts in its own process and browser (case_isolation.py)
+    elif preempting and slot.driver:
+        # Recycling would kill the paused job's session: run on it as is
+        driver = slot.driver
+    else:
         try:
-            options = Options()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            # options.add_argument("--headless") # Optional
-            DRIVER_INSTANCE = webdriver.Chrome(options=options)
+            driver = slot.ensure_driver(job['browserProfile'])
         except Exception as e:
-            print(f"Failed to start driver: {e}")
+            slot.log(f"Failed to start driver: {e}")
             update_job_status(job['id'], "Failed")
             return
+    # Suites call this between cases so higher-priority jobs are not stuck behind them
+    job['checkpoint'] = lambda: preempt(job, slot)
 
     # 4. Execute Tests
     all_passed = True
-    test_functions = [func for name, func in vars(module).items() if callable(func) and name.startswith("run_")]
+    test_functions = module.run_functions()
 
     # Optional Filter
     test_filter = job.get('testFilter')
@@ -160,7 +275,7 @@ def run_job(job):
     if test_filter:
         print(f"Filter requested: {test_filter}")
         # 1. Try exact match
-        exact_matches = [t for t in test_functions if t.__name__ == test_filter]
+        exact_matches = [t for t in test_functions if t[0] == test_filter]
         if exact_matches:
             filtered_functions = exact_matches
         else:
@@ -175,74 +290,273 @@ def run_job(job):
         update_job_status(job['id'], "Failed")
         return
 
-    import inspect # Ensure inspect is available (add to imports if missing, but better handle here or top)
-
-    for test_func in filtered_functions:
-        test_name = test_func.__name__
-        print(f" Running {test_name}...")
+    batcher = ResultBatcher()
+    retry = job['retryPolicy'] = RetryPolicy()  # Budget shared with the suite dispatcher's cases
+    trace = current_trace()
+    job_network = {}
+    for index, (test_name, test_func, arity) in enumerate(filtered_functions):
+        if index:
+            job['checkpoint']()
+        slot.set_status(f"running {test_name} (job {job['id']})")
+        EVENTS.emit("case.started", name=test_name)
+        started = time.time()
         try:
-            # Check Signature
-            sig = inspect.signature(test_func)
-            if len(sig.parameters) >= 2:
-                # Expects driver + job/context
-                result = test_func(DRIVER_INSTANCE, job)
-            else:
-                result = test_func(DRIVER_INSTANCE) # Legacy support
-            
-            # Enrich Result with Project ID
-            
+            mark = trace.mark()
+            with span("test", test=test_name):
+                if getattr(test_func, "handles_retries", False):
+                    result = call_entry(test_func, arity, driver, job)
+                elif CASE_ISOLATION:
+                    source = module.module
+                    result = retry.run(test_name, lambda _: run_isolated(source.__file__, source.__name__, test_name, job, test_name),
+                                       None, job['browserProfile'])
+                else:
+                    result = retry.run(test_name, lambda attempt_driver: run_entry(module.module, test_func, arity, attempt_driver, job, test_name, retry),
+                                       driver, job['browserProfile'])
+
+            # Attach per-step timing breakdown and network savings
+            result.setdefault('steps', trace.breakdown(mark))
+            network = collect_network_stats(driver) if driver else result.get('network')
+            if network:
+                result.setdefault('network', network)
+                merge_stats(job_network, network)
+
             # Enrich Result with Project ID
             result['projectId'] = project_id
             
-            # Post Result
-            print(f"  Result: {result['status']}. Uploading...")
-            requests.post(f"{BACKEND_URL}/save-result", json=result)
+            # Queue Result for upload
+            print(f"  Result: {result['status']}. Queued for upload.")
+            EVENTS.emit("case.finished", name=test_name, status=result['status'], duration=round(time.time() - started, 3))
+            for item in expand_results(result):
+                item.setdefault('projectId', project_id)
+                batcher.add(item)
             
-            if result['status'] != "PASS":
+            if result['status'] not in PASSING_STATUSES:
                 all_passed = False
         except Exception as e:
             print(f"  Error running {test_name}: {e}")
             traceback.print_exc()
+            EVENTS.emit("case.finished", name=test_name, status="FAIL", duration=round(time.time() - started, 3), error=str(e))
             all_passed = False
 
     final_status = "Completed" if all_passed else "Failed"
-    print(f"Job Finished: {final_status} (Passed: {all_passed})")
-    update_job_status(job['id'], final_status)
+    if job_network:
+        slot.log(f"Network: {job_network.get('blocked', 0)} requests blocked, "
+                 f"{job_network.get('fromCache', 0)} served from cache, "
+                 f"{job_network.get('bytesSaved', 0) / 1024:.0f} KB saved")
+    slot.log(f"Job Finished: {final_status} (Passed: {all_passed})")
+    # Upload and report off the browser thread: the slot can start its next job meanwhile
+    in_background(finish_job, job['id'], batcher, final_status)
     print("---------------------------------------------------------------")
-    cleanup_driver()
+    if preempting:
+        # Hand the session back to the paused job in a clean state
+        if slot.driver:
+            with span("driver.reset"):
+                slot.reset_state()
+        return
+    slot.release()
+    slot.set_status("idle")
 
-def main():
-    print(f"Starting Multi-Project Automation Worker.")
-    print(f"Backend: {BACKEND_URL}")
-    
-    # Auto-Clear Queue on Startup
-    print("----------------------------------------------------------------")
-    print("  Auto-clearing pending jobs to prevent backlog execution...")
+def finish_job(job_id, batcher, final_status):
+    """
+    Uploads a job's remaining results, then reports its final status (in that order,
+    so the dashboard never shows a finished job with missing results).
+    """
+    batcher.flush()
+    update_job_status(job_id, final_status)
+
+async def wait_or_stop(stop, seconds):
+    """
+    Sleeps `seconds`, returning early (True) when the worker is stopping.
+    """
     try:
-        requests.delete(f"{BACKEND_URL}/jobs/queue")
-        print("  Queue cleared successfully.")
-    except Exception as e:
-        print(f"  Warning: Failed to clear queue: {e}")
-    print("----------------------------------------------------------------")
+        await asyncio.wait_for(stop.wait(), seconds)
+        return True
+    except asyncio.TimeoutError:
+        return False
 
-    print(f"Polling every {POLL_INTERVAL}s...")
+async def slot_task(slot, stop):
+    """
+    One pool slot: takes the most urgent local job and runs it on this slot's driver.
+    Selenium is blocking, so all browser work runs on the slot's own thread; the event loop
+    stays free for heartbeats, intake and uploads.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=slot.name)
+    try:
+        while not stop.is_set():
+            try:
+                job = await loop.run_in_executor(executor, SCHEDULER.next_job, 1, slot)
+                if job:
+                    slot.set_status(f"starting job {job['id']}")
+                    await loop.run_in_executor(executor, run_job, job, slot)
+            except Exception as e:
+                slot.log(f"Slot loop error: {e}")
+                traceback.print_exc()
+                await wait_or_stop(stop, POLL_INTERVAL)
+    finally:
+        await loop.run_in_executor(executor, slot.cleanup)
+        executor.shutdown(wait=False)
+
+def in_daemon_thread(func, *args):
+    """
+    Awaitable running `func` on a daemon thread. Used for the long-poll, which cannot be
+    interrupted: shutdown must not wait for it the way it waits for executor threads.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result=None, error=None):
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target():
+        try:
+            outcome = (func(*args), None)
+        except Exception as e:
+            outcome = (None, e)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:
+            pass  # Loop already closed: the worker stopped while this poll was pending
+
+    threading.Thread(target=target, name="job-intake", daemon=True).start()
+    return future
 
+async def intake_task(stop):
+    while not stop.is_set():
+        try:
+            if not await in_daemon_thread(SCHEDULER.intake_once):
+                await wait_or_stop(stop, 1)
+        except Exception as e:
+            print(f"Job intake error: {e}")
+            await wait_or_stop(stop, POLL_INTERVAL)
+
+async def lease_task(stop):
+    while not await wait_or_stop(stop, LEASES.RENEW_INTERVAL):
+        await asyncio.to_thread(LEASES.renew_all)
+
+async def heartbeat_task(stop):
+    """
+    Reports this worker's capacity, independently of running jobs. A pending long-poll already keeps
+    the worker marked online, so while one is open the heartbeat is only sent when capacity changed
+    or after HEARTBEAT_MAX_SILENCE.
+    """
+    last_payload, last_sent = None, 0
+    while not stop.is_set():
+        payload = capacity(SLOTS)
+        if not POLLER.long_poll or payload != last_payload or time.time() - last_sent >= HEARTBEAT_MAX_SILENCE:
+            await asyncio.to_thread(send_heartbeat, payload)
+            last_payload, last_sent = payload, time.time()
+        busy = len(SLOTS) - payload["freeSlots"]
+        print(f"[{time.strftime('%H:%M:%S')}] Slots busy: {busy}/{len(SLOTS)}", end='\r')
+        await wait_or_stop(stop, POLL_INTERVAL)
+
+async def upload_task(uploads):
+    """
+    Runs backend calls queued with in_background() (result uploads, status updates, lease release)
+    one at a time, in submission order.
+    """
     while True:
+        func, args = await uploads.get()
         try:
-            # Send Heartbeat
-            try: requests.post(f"{BACKEND_URL}/worker-heartbeat", timeout=2) 
-            except: pass
-
-            job = get_next_job()
-            if job:
-                run_job(job)
-            else:
-                print(f"[{time.strftime('%H:%M:%S')}] No pending jobs. Waiting...", end='\r')
+            await asyncio.to_thread(func, *args)
         except Exception as e:
-            print(f"Main loop error: {e}")
+            print(f"Background upload failed: {e}")
             traceback.print_exc()
-        
-        time.sleep(POLL_INTERVAL)
+        finally:
+            uploads.task_done()
+
+async def event_task(stop):
+    """
+    Sends buffered progress events and log lines in frames every EVENT_FLUSH_INTERVAL;
+    backs off while the backend is unreachable (events keep accumulating in the ring buffer).
+    """
+    while not await wait_or_stop(stop, EVENT_FLUSH_INTERVAL):
+        if EVENTS.pending() and not await asyncio.to_thread(EVENTS.send_pending, WORKER_ID):
+            await wait_or_stop(stop, POLL_INTERVAL)
+
+async def run_worker(size):
+    """
+    Asyncio worker core: `size` slots (each with its own WebDriver) plus independent heartbeat,
+    intake, lease renewal and upload tasks. A single-slot worker keeps MAIN_SLOT.
+    The first SIGINT/SIGTERM drains (no new jobs, running jobs finish, pending uploads are sent);
+    a second one exits immediately.
+    """
+    if size > 1:
+        SLOTS[:] = [DriverSlot(f"slot-{i + 1}") for i in range(size)]
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    uploads = asyncio.Queue()
+    set_background(lambda func, *args: loop.call_soon_threadsafe(uploads.put_nowait, (func, args)))
+
+    def request_stop(sig):
+        if stop.is_set():
+            print(f"Received signal {sig} again. Exiting without draining...")
+            cleanup_driver()
+            release_own_jobs()
+            os._exit(1)
+        print(f"\nReceived signal {sig}. Draining: finishing running jobs (up to {DRAIN_TIMEOUT}s), then uploads...")
+        stop.set()
+        SHUTDOWN_EVENT.set()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, request_stop, sig)
+
+    if CASE_ISOLATION:
+        await asyncio.to_thread(ISOLATION_POOL.start, ISOLATION_POOL_SIZE or size)
+    slots = [asyncio.create_task(slot_task(slot, stop)) for slot in SLOTS]
+    install_event_stream()
+    services = [asyncio.create_task(coro) for coro in (intake_task(stop), lease_task(stop), heartbeat_task(stop), event_task(stop))]
+    uploader = asyncio.create_task(upload_task(uploads))
+    print(f"Started {size} worker slot(s). Waiting for jobs (long-poll {LONG_POLL_TIMEOUT}s, "
+          f"fallback polling up to every {POLL_INTERVAL}s)...")
+
+    await stop.wait()
+    _, unfinished = await asyncio.wait(slots, timeout=DRAIN_TIMEOUT)
+    if unfinished:
+        print(f"{len(unfinished)} slot(s) still busy after {DRAIN_TIMEOUT}s. Abandoning their jobs.")
+    for task in services:
+        task.cancel()
+    try:
+        await asyncio.wait_for(uploads.join(), UPLOAD_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"{uploads.qsize()} upload(s) still pending after {UPLOAD_DRAIN_TIMEOUT}s. Exiting without them.")
+    uploader.cancel()
+    set_background(None)
+    await asyncio.to_thread(EVENTS.send_pending, WORKER_ID)
+
+    cleanup_driver()
+    # Prefetched and abandoned jobs go back to the fleet right away instead of waiting for their lease
+    await asyncio.to_thread(release_own_jobs)
+    print("Worker stopped.")
+
+def main():
+    global WORKER_ID
+    WORKER_ID = claim_worker_id()
+    print(f"Starting Multi-Project Automation Worker.")
+    print(f"Backend: {BACKEND_URL}")
+    print(f"Worker ID: {WORKER_ID}")
+
+    print("----------------------------------------------------------------")
+    if CLEAR_QUEUE_ON_START:
+        # Old single-worker behaviour: drops every pending job, including other workers' backlog
+        print("  Auto-clearing pending jobs to prevent backlog execution...")
+        try:
+            get_client().delete("/jobs/queue")
+            print("  Queue cleared successfully.")
+        except Exception as e:
+            print(f"  Warning: Failed to clear queue: {e}")
+    else:
+        # Only requeue jobs this worker held before a restart; other workers are left alone
+        release_own_jobs()
+    print("----------------------------------------------------------------")
+
+    asyncio.run(run_worker(WORKER_SLOTS))
 
 if __name__ == "__main__":
     main()
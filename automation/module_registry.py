@@ -0,0 +1,164 @@
+import os
+import sys
+import ast
+import inspect
+import threading
+import importlib.util
+
+
+class ModuleEntry:
+    """
+    A loaded test module plus its pre-discovered entry points.
+    `functions` maps name -> (func, arity) for every callable defined in the module that can be run
+    (imported names are never entry points), so callers never need to re-run inspect.signature per job.
+    `helpers` maps the local helper modules it imports to their fingerprint when it was executed.
+    """
+    def __init__(self, module, fingerprint, helpers=None):
+        self.module = module
+        self.fingerprint = fingerprint
+        self.helpers = helpers or {}
+        self.functions = {}
+        for name, obj in vars(module).items():
+            if getattr(obj, "__module__", None) != module.__name__:
+                continue
+            if callable(obj) and (name == "run" or name.startswith("run_") or name.endswith("_case")):
+                try:
+                    arity = len(inspect.signature(obj).parameters)
+                except (TypeError, ValueError):
+                    arity = 1
+                self.functions[name] = (obj, arity)
+
+    def run_functions(self):
+        """
+        All `run_*` functions in definition order, as (name, func, arity).
+        """
+        return [(name, func, arity) for name, (func, arity) in self.functions.items() if name.startswith("run_")]
+
+    def find_entry(self, name_hint=None):
+        """
+        Dispatcher lookup order: explicit hint, then `run`, then the first `*_case` / `run_*`.
+        Returns (func, arity) or None.
+        """
+        if name_hint and name_hint in self.functions:
+            return self.functions[name_hint]
+        if name_hint and callable(getattr(self.module, name_hint, None)):
+            func = getattr(self.module, name_hint)
+            self.functions[name_hint] = (func, len(inspect.signature(func).parameters))
+            return self.functions[name_hint]
+        if "run" in self.functions:
+            return self.functions["run"]
+        for name, entry in self.functions.items():
+            if name.endswith("_case") or name.startswith("run_"):
+                return entry
+        return None
+
+
+class ModuleRegistry:
+    """
+    Caches executed test modules keyed by file path.
+    A module is re-executed only when its file or one of the local helper modules it imports
+    (e.g. login_helper.py next to the cases) changes (mtime or size), so repeated jobs skip
+    the import cost while edits to tests and helpers are still picked up.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.imported = {}  # helper path -> fingerprint of the copy in sys.modules
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def local_helpers(self, path):
+        """
+        Modules in the directory of `path` that it imports, transitively, as {path: fingerprint}.
+        """
+        directory = os.path.dirname(path)
+        helpers, pending = {}, [path]
+        while pending:
+            current = pending.pop()
+            try:
+                with open(current) as f:
+                    tree = ast.parse(f.read(), current)
+            except (OSError, SyntaxError):
+                continue
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    names = [alias.name for alias in node.names]
+                elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                    names = [node.module]
+                else:
+                    continue
+                for name in names:
+                    candidate = os.path.join(directory, name.split(".")[0] + ".py")
+                    if candidate != path and candidate not in helpers and os.path.exists(candidate):
+                        helpers[candidate] = self.fingerprint(candidate)
+                        pending.append(candidate)
+        return helpers
+
+    def _forget_stale(self, helpers):
+        """
+        Drops helper modules edited since they were imported from sys.modules,
+        so executing the case imports the current version.
+        """
+        for helper_path, fingerprint in helpers.items():
+            if self.imported.get(helper_path) == fingerprint:
+                continue
+            for name, module in list(sys.modules.items()):
+                module_file = getattr(module, "__file__", None)
+                if module_file and os.path.abspath(module_file) == helper_path:
+                    print(f"Reloading changed helper module {helper_path}")
+                    del sys.modules[name]
+            self.imported[helper_path] = fingerprint
+
+    def load(self, path, module_name):
+        """
+        Returns a ModuleEntry for `path`, executing the file only if it or one of its
+        local helpers is new or changed.
+        Raises like a normal import when the module itself fails to execute.
+        """
+        path = os.path.abspath(path)
+        fingerprint = self.fingerprint(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry.fingerprint == fingerprint:
+                try:
+                    unchanged = all(self.fingerprint(helper) == known for helper, known in entry.helpers.items())
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    return entry
+
+            if entry:
+                print(f"Reloading changed module {path}")
+            helpers = self.local_helpers(path)
+            self._forget_stale(helpers)
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = module
+            spec.loader.exec_module(module)
+
+            entry = ModuleEntry(module, fingerprint, helpers)
+            self.entries[path] = entry
+            return entry
+
+
+def call_entry(func, arity, driver, job, row=None):
+    """
+    Calls a test entry point with the arguments its signature accepts.
+    With a data `row` (see case_data.py) it is passed as the third argument,
+    or as job['row'] to entry points taking (driver, job).
+    """
+    if row is not None:
+        if arity >= 3:
+            return func(driver, job, row)
+        if arity == 2:
+            return func(driver, dict(job, row=row))
+    if arity >= 2:
+        # Expects driver + job/context
+        return func(driver, job)
+    return func(driver)  # Legacy support
+
+
+registry = ModuleRegistry()
@@ -0,0 +1,112 @@
+import os
+import json
+import threading
+
+NETWORK_BLOCKING = os.getenv("NETWORK_BLOCKING", "true").lower() == "true"
+NETWORK_CACHE_DIR = os.getenv("NETWORK_CACHE_DIR", os.path.join(os.path.dirname(__file__), "browser_cache"))
+
+# Third-party analytics / ads that tests never need. Extra patterns: NETWORK_BLOCK_PATTERNS (comma separated).
+DEFAULT_BLOCK_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*adservice.google.*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*mixpanel.com*",
+    "*segment.io*",
+]
+EXTRA_BLOCK_PATTERNS = [p.strip() for p in os.getenv("NETWORK_BLOCK_PATTERNS", "").split(",") if p.strip()]
+
+_cache_leases = set()
+_cache_lock = threading.Lock()
+
+
+def block_patterns():
+    return DEFAULT_BLOCK_PATTERNS + EXTRA_BLOCK_PATTERNS if NETWORK_BLOCKING else []
+
+
+def lease_cache_dir():
+    """
+    Hands out a persistent disk-cache directory not used by any other live session in this worker.
+    Directories survive between sessions and jobs, so static assets (JS bundles, fonts, images)
+    downloaded by one session are served from disk to the next one.
+    """
+    with _cache_lock:
+        index = 0
+        while index in _cache_leases:
+            index += 1
+        _cache_leases.add(index)
+    path = os.path.join(NETWORK_CACHE_DIR, f"session-{index}")
+    os.makedirs(path, exist_ok=True)
+    return index, path
+
+
+def release_cache_dir(index):
+    with _cache_lock:
+        _cache_leases.discard(index)
+
+
+def configure_options(options, settings):
+    """
+    Adds shared-cache and network-stats capabilities to Chrome options.
+    Returns the cache lease index (release it when the session ends) or None.
+    """
+    lease = None
+    if settings.get("shared_cache"):
+        lease, path = lease_cache_dir()
+        options.add_argument(f"--disk-cache-dir={path}")
+    if settings.get("network_stats"):
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return lease
+
+
+def collect_network_stats(driver):
+    """
+    Drains the session's performance log and summarises network activity since the last call:
+    requests, requests blocked, responses served from cache, bytes transferred and bytes saved by the cache.
+    Returns None when the session was not started with network stats enabled.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+
+    stats = {"requests": 0, "blocked": 0, "fromCache": 0, "bytesTransferred": 0, "bytesSaved": 0}
+    cached, received = set(), {}
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method, params = message.get("method"), message.get("params", {})
+        request_id = params.get("requestId")
+
+        if method == "Network.requestWillBeSent":
+            stats["requests"] += 1
+        elif method == "Network.requestServedFromCache":
+            cached.add(request_id)
+        elif method == "Network.responseReceived":
+            response = params.get("response", {})
+            if response.get("fromDiskCache") or response.get("fromPrefetchCache"):
+                cached.add(request_id)
+        elif method == "Network.dataReceived":
+            received[request_id] = received.get(request_id, 0) + params.get("dataLength", 0)
+        elif method == "Network.loadingFinished":
+            stats["bytesTransferred"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            stats["blocked"] += 1
+
+    stats["fromCache"] = len(cached)
+    stats["bytesSaved"] = sum(received.get(request_id, 0) for request_id in cached)
+    return stats
+
+
+def merge_stats(total, stats):
+    if stats:
+        for key, value in stats.items():
+            total[key] = total.get(key, 0) + value
+    return total
@@ -1,6 +1,6 @@
-import time
 # Import the helper. Since cases/ is in sys.path (via tests.py), this works.
 from selenium.webdriver.common.by import By
+from base_page import BasePage
 try:
     from login_helper import perform_login
 except ImportError:
@@ -25,11 +25,11 @@ def add_case(driver):
     # 2. Navigate to Add Page (Example)
     # driver.get(".../add")
     
-    # Simulation of adding an item
-    time.sleep(2) 
-    
-    driver.find_element(By.XPATH, "//span[normalize-space()='Master Data']").click()
-    driver.find_element(By.XPATH, "//a[@text='Sector]").click()
+    # Simulation of adding an item (clicks wait until the menu is ready)
+    page = BasePage(driver)
+    page.click((By.XPATH, "//span[normalize-space()='Master Data']"))
+    page.click((By.XPATH, "//a[@text='Sector]"))
+    print(f"[AMS4U] {page.wait_summary()}")
     result["status"] = "PASS"
     result["message"] = "Login successful"
     
@@ -2,7 +2,14 @@
 import time
 import traceback
 from selenium.webdriver.common.by import By
-from utils import resize_and_encode_screenshot
+from utils import capture_screenshot_async
+from base_page import BasePage
+from result_model import TestResult
+from session_cache import capture_session
+try:
+    from login_helper import AMS_BASE_URL
+except ImportError:
+    from .login_helper import AMS_BASE_URL
 
 import os
 from dotenv import load_dotenv
@@ -13,22 +20,14 @@ def login_case(driver):
     """
     Executes the login test for AMS4U.
     """
-    result = {
-        "testName": "Login Test (AMS4U)",
-        "status": "FAIL",
-        "message": "",
-        "duration": 0,
-        "screenshotBase64": "",
-        "errorStack": "",
-        "browser": driver.name,
-        "environment": "local"
-    }
+    result = TestResult.new(driver, "Login Test (AMS4U)")
     
     start_time = time.time()
     
     try:
         # 1. Navigate
-        driver.get("https://cms-ams4u-development-new.qbit.co.id/login")
+        # Always a real login: this case tests the login flow itself
+        driver.get(f"{AMS_BASE_URL}/login")
         
         # 2. Input Credentials
         email = os.getenv("AMS_EMAIL")
@@ -40,23 +39,27 @@ def login_case(driver):
         # 3. Click Login
         driver.find_element(By.XPATH, "//button[@type='submit']").click()
         
-        # 4. Verify Success
-        time.sleep(3) # Wait for redirect
+        # 4. Verify Success (wait for the redirect instead of a fixed sleep)
+        page = BasePage(driver)
+        redirected = page.wait_url_contains("/dashboard", raise_on_timeout=False)
+        print(f"[AMS4U] {page.wait_summary()}")
         current_url = driver.current_url
-        if "/dashboard" in current_url:
+        if redirected:
             result["status"] = "PASS"
             result["message"] = "Login successful"
+            # Later cases in the suite restore this session instead of logging in again
+            capture_session(driver, AMS_BASE_URL, email)
         else:
             result["status"] = "FAIL"
             result["message"] = f"Login failed: Expected /dashboard, got {current_url}"
-            result["screenshotBase64"] = resize_and_encode_screenshot(driver)
+            result["screenshotBase64"] = capture_screenshot_async(driver)
 
     except Exception as e:
         result["status"] = "FAIL"
         result["message"] = str(e)
         result["errorStack"] = traceback.format_exc()
         try:
-            result["screenshotBase64"] = resize_and_encode_screenshot(driver)
+            result["screenshotBase64"] = capture_screenshot_async(driver)
         except:
             pass
 
@@ -2,25 +2,40 @@ import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from base_page import BasePage
+from session_cache import restore_session, capture_session
 
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def perform_login(driver, email=None, password=None):
+AMS_BASE_URL = os.getenv("AMS_BASE_URL", "https://cms-ams4u-development-new.qbit.co.id")
+
+def is_logged_in(driver):
+    """
+    Validation step for a restored session: the dashboard must load without bouncing to /login.
+    """
+    driver.get(f"{AMS_BASE_URL}/dashboard")
+    page = BasePage(driver, timeout=5)
+    page.wait_dom_stable()
+    return "/dashboard" in driver.current_url and "/login" not in driver.current_url
+
+def perform_login(driver, email=None, password=None, use_cache=True):
     if email is None:
         email = os.getenv("AMS_EMAIL")
     if password is None:
         password = os.getenv("AMS_PASSWORD")
 
+    # Reuse a cached authenticated session when one is still valid
+    if use_cache and restore_session(driver, AMS_BASE_URL, email, is_logged_in):
+        return True
+
     print("[AMS4U] Performing Login...")
     
     try:
         # 1. Navigate
-        # Check if we are already on the login page or dashboard to avoid reload if possible?
-        # For now, just go to login page to be safe.
-        driver.get("https://cms-ams4u-development-new.qbit.co.id/login")
+        driver.get(f"{AMS_BASE_URL}/login")
         
         # 2. Input Credentials
         # Wait for elements to be present
@@ -42,6 +57,7 @@ def perform_login(driver, email=None, password=None):
         try:
             wait.until(EC.url_contains("/dashboard"))
             print("[AMS4U] Login successful - Redirected to Dashboard")
+            capture_session(driver, AMS_BASE_URL, email)
             return True
         except:
             print(f"[AMS4U] Login verification failed. Current URL: {driver.current_url}")
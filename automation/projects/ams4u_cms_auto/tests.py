@@ -1,10 +1,28 @@
 
 import sys
 import os
-import importlib.util
+import time
 import traceback
 import glob
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from module_registry import registry
+from tracing import current_trace, activate, span
+from network_layer import collect_network_stats
+from case_history import CaseHistory
+from result_model import PASSING_STATUSES
+from retry_policy import RetryPolicy, handles_retries
+from event_stream import EVENTS, current_context, use_context
+import case_isolation
+from case_isolation import CASE_ISOLATION
+import case_data
+from case_selection import SUITE_SELECTION, SUITE_FULL_RUN_HOURS, build_identifier, fingerprint_case, select_changed
 
+SUITE_SHARDS = int(os.getenv("SUITE_SHARDS", "1"))  # Browser sessions used for "run all"
+SUITE_FAIL_FAST = os.getenv("SUITE_FAIL_FAST", "false").lower() == "true"  # Stop "run all" at the first failing case
+
+@handles_retries
 def run_dispatcher(driver, job):
     """
     Main dispatcher for AMS4U project.
@@ -20,8 +38,29 @@ def run_dispatcher(driver, job):
     if cases_dir not in sys.path:
         sys.path.append(cases_dir)
     
-    # helper to run a single file
-    def run_file(filename, func_name_hint=None):
+    elapsed = {}  # filename -> wall time of its last run, for the case history
+    retry = job.get('retryPolicy') or RetryPolicy()
+
+    # helper to run a single file (failed cases are retried, see retry_policy.py)
+    def run_file(filename, func_name_hint=None, case_driver=None):
+        started = time.time()
+        EVENTS.emit("case.started", name=filename)
+        res = None
+        try:
+            if not os.path.exists(os.path.join(cases_dir, filename)):
+                res = run_case(filename, func_name_hint, case_driver)
+            else:
+                # Isolated cases bring their own browser: no driver (and no fresh retry driver) here
+                res = retry.run(filename, lambda attempt_driver: run_case(filename, func_name_hint, attempt_driver),
+                                None if CASE_ISOLATION else case_driver or driver, job.get('browserProfile'))
+            return res
+        finally:
+            elapsed[filename] = time.time() - started
+            EVENTS.emit("case.finished", name=filename, status=res['status'] if res else "FAIL",
+                        duration=round(elapsed[filename], 3))
+
+    def run_case(filename, func_name_hint=None, case_driver=None):
+        case_driver = case_driver or driver
         full_path = os.path.join(cases_dir, filename)
         if not os.path.exists(full_path):
              return {
@@ -29,41 +68,36 @@ def run_dispatcher(driver, job):
                 "status": "FAIL",
                 "message": f"Case file '{filename}' not found."
             }
+        if CASE_ISOLATION:
+            return case_isolation.run_isolated(full_path, f"cases.{filename.replace('.py','')}", func_name_hint, job, f"Case {filename}")
 
         try:
-            spec = importlib.util.spec_from_file_location(f"cases.{filename.replace('.py','')}", full_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Find entry function
-            func = None
-            if func_name_hint and hasattr(module, func_name_hint):
-                func = getattr(module, func_name_hint)
-            elif hasattr(module, "run"):
-                 func = module.run
-            else:
-                # Fallback
-                for name, obj in vars(module).items():
-                    if callable(obj) and (name.endswith("_case") or name.startswith("run_")):
-                        func = obj
-                        break
-            
-            if not func:
+            # Cached per file: re-imported only when the case file changed
+            loaded = registry.load(full_path, f"cases.{filename.replace('.py','')}")
+            entry = loaded.find_entry(func_name_hint)
+
+            if not entry:
                 return {
                     "testName": f"Case {filename}",
                     "status": "FAIL",
                     "message": f"No valid entry function found in {filename}"
                 }
-                
+
+            func, arity = entry
             print(f"[AMS4U] Running {func.__name__} from {filename}")
-            
-            import inspect
-            sig = inspect.signature(func)
-            if len(sig.parameters) >= 2:
-                 return func(driver, job)
-            else:
-                 return func(driver)
-                 
+            trace = current_trace()
+            mark = trace.mark() if trace else 0
+            with span("case", file=filename):
+                # Once, or once per data row for cases with a DATASET (see case_data.py)
+                res = case_data.run_entry(loaded.module, func, arity, case_driver, job, filename, retry)
+            if isinstance(res, dict):
+                if trace:
+                    res.setdefault('steps', trace.breakdown(mark))
+                network = collect_network_stats(case_driver)
+                if network:
+                    res.setdefault('network', network)
+            return res
+
         except Exception as e:
             return {
                 "testName": f"Error in {filename}",
@@ -78,37 +112,98 @@ def run_dispatcher(driver, job):
         print("[AMS4U] MODE: RUN ALL CASES (No Filter)")
         print("--------------------------------------------------")
         
-        case_files = glob.glob(os.path.join(cases_dir, "case_*.py"))
+        case_files = sorted(glob.glob(os.path.join(cases_dir, "case_*.py")))
         if not case_files:
              return {"testName": "Suite", "status": "FAIL", "message": "No case files found in cases/"}
 
-        BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000/api")
-        import requests
-        
-        failures = []
-        overall_status = "PASS"
-        
-        for case_path in case_files:
-            filename = os.path.basename(case_path)
-            print(f"[AMS4U] Found Case: {filename}")
-            res = run_file(filename)
-            
-            # Enrich and Upload Result immediately for each case
-            res['projectId'] = job.get('projectId')
-            try:
-                print(f"[AMS4U] Uploading result for {filename}...")
-                requests.post(f"{BACKEND_URL}/save-result", json=res)
-            except Exception as e:
-                print(f"[AMS4U] Failed to upload sub-result: {e}")
-                
-            if res['status'] != "PASS":
-                failures.append(filename)
-                overall_status = "FAIL"
-                
+        from backend_client import ResultBatcher, in_background
+        batcher = ResultBatcher()
+
+        def upload(filename, res):
+            # Enrich and queue Result for batched upload (one per data row, plus the case's aggregate)
+            print(f"[AMS4U] Queueing result for {filename}...")
+            for item in case_data.expand_results(res):
+                item['projectId'] = job.get('projectId')
+                batcher.add(item)
+
+        history = CaseHistory(os.path.basename(current_dir))
+        all_cases = [os.path.basename(case_path) for case_path in case_files]
+
+        # Change-aware runs fingerprint each case (its module, the helpers it imports and the target's build id)
+        change_aware = (job.get('selection') or SUITE_SELECTION) == "changed"
+        fingerprints = {}
+        if change_aware:
+            worker_dir = os.path.dirname(os.path.dirname(current_dir))
+            build_id = build_identifier(job.get('targetUrl'))
+            fingerprints = {
+                filename: fingerprint_case(os.path.join(cases_dir, filename), [cases_dir, worker_dir], build_id)
+                for filename in all_cases
+            }
+        unchanged = []
+        if change_aware and not history.full_run_due(SUITE_FULL_RUN_HOURS):
+            selected, unchanged = select_changed(history, all_cases, fingerprints)
+            print(f"[AMS4U] Change-aware selection: {len(selected)} changed or failed, {len(unchanged)} unchanged (skipped)")
+        else:
+            selected = all_cases
+        if not selected:
+            return {
+                "testName": "Full Suite Execution",
+                "status": "PASS",
+                "message": f"No changes since the last passing run: skipped all {len(all_cases)} cases.",
+                "duration": 0
+            }
+
+        # Failed-first, then shortest first, from this worker's history of the suite
+        filenames = history.order(selected)
+        shard_count = min(int(job.get('shards') or SUITE_SHARDS), len(filenames))
+        fail_fast = bool(job.get('failFast', SUITE_FAIL_FAST))
+        stop = threading.Event()
+
+        if shard_count > 1:
+            results = _run_sharded(history.pack(filenames, shard_count), driver, run_file, job, stop if fail_fast else None)
+            # Upload in case order so output stays deterministic regardless of shard timing
+            for filename in filenames:
+                if filename in results:
+                    upload(filename, results[filename])
+        else:
+            results = {}
+            checkpoint = job.get('checkpoint')
+            for index, filename in enumerate(filenames):
+                if index and checkpoint:
+                    # Let the runner slot in a higher-priority job between cases
+                    checkpoint()
+                print(f"[AMS4U] Found Case: {filename}")
+                results[filename] = run_file(filename)
+                upload(filename, results[filename])
+                if fail_fast and results[filename]['status'] not in PASSING_STATUSES:
+                    stop.set()
+                    break
+
+        in_background(batcher.flush)  # Off the browser thread when the async worker core is running
+
+        for filename, res in results.items():
+            if filename in elapsed:
+                history.record(filename, res['status'], elapsed[filename], fingerprints.get(filename))
+        executed = [filename for filename in filenames if filename in results]
+        if not unchanged and len(executed) == len(all_cases):
+            history.mark_full_run()
+        history.save()
+
+        failures = [filename for filename in executed if results[filename]['status'] not in PASSING_STATUSES]
+        overall_status = "FAIL" if failures else "PASS"
+        message = f"Executed {len(executed)} cases. Failures: {failures}" if failures else f"All {len(executed)} cases passed."
+        if len(executed) < len(filenames):
+            message += f" Fail-fast: skipped {len(filenames) - len(executed)} cases."
+        flaky = [filename for filename in executed if results[filename]['status'] == "FLAKY"]
+        if flaky:
+            message += f" Flaky (passed on retry): {flaky}"
+        if unchanged:
+            message += f" Unchanged since last pass: skipped {len(unchanged)} cases."
+
         return {
             "testName": "Full Suite Execution",
             "status": overall_status,
-            "message": f"Executed {len(case_files)} cases. Failures: {failures}" if failures else f"All {len(case_files)} cases passed.",
+            "message": message,
             "duration": 0
         }
 
@@ -135,4 +230,57 @@ def run_dispatcher(driver, job):
                 target_case_file = f"case_{clean_name}.py"
 
         print(f"[AMS4U] Resolved target file: {target_case_file}")
-        return run_file(target_case_file, target_func_name)
+        res = run_file(target_case_file, target_func_name)
+        if os.path.exists(os.path.join(cases_dir, target_case_file)):
+            history = CaseHistory(os.path.basename(current_dir))
+            history.record(target_case_file, res['status'], elapsed[target_case_file])
+            history.save()
+        return res
+
+
+def _run_sharded(shards, driver, run_file, job, stop=None):
+    """
+    Runs each list of case files in `shards` in its own browser session.
+    Shard 0 reuses the runner's driver; the others get their own (same browser profile as the job)
+    and quit it when done. With CASE_ISOLATION the shards only feed cases to the process pool.
+    With a `stop` event (fail-fast) the first failure stops every shard before its next case.
+    Returns {filename: result} for the cases that ran.
+    """
+    from driver_manager import fresh_driver
+
+    shard_count = len(shards)
+    trace = current_trace()
+    context = current_context()
+    print(f"[AMS4U] Sharding {sum(len(shard) for shard in shards)} cases across {shard_count} sessions")
+
+    def run_shard(index):
+        activate(trace)  # record shard spans into the job's trace
+        use_context(context)  # and stream their events under the job
+        shard_results = {}
+        if index > 0 and not CASE_ISOLATION:
+            session = fresh_driver(job.get('browserProfile'))  # quit when the shard is done
+        else:
+            session = nullcontext(driver if index == 0 else None)
+        try:
+            with session as shard_driver:
+                for filename in shards[index]:
+                    if stop and stop.is_set():
+                        break
+                    print(f"[AMS4U][shard-{index + 1}] Running Case: {filename}")
+                    shard_results[filename] = run_file(filename, case_driver=shard_driver)
+                    if stop and shard_results[filename]['status'] not in PASSING_STATUSES:
+                        stop.set()
+        except Exception as e:
+            for filename in shards[index]:
+                shard_results.setdefault(filename, {
+                    "testName": f"Error in {filename}",
+                    "status": "FAIL",
+                    "message": f"Shard {index + 1} failed: {e}"
+                })
+        return shard_results
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=shard_count) as executor:
+        for shard_results in executor.map(run_shard, range(shard_count)):
+            results.update(shard_results)
+    return results
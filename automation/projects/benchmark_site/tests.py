@@ -0,0 +1,52 @@
+import os
+import time
+import traceback
+from selenium.webdriver.common.by import By
+from utils import capture_screenshot_async
+from base_page import BasePage
+from result_model import TestResult
+
+# Synthetic project used by benchmark.py against its local static site.
+# The site URL comes from the project's baseUrl (job['targetUrl']).
+
+def _run(driver, job, name, steps):
+    result = TestResult.new(driver, name, environment="benchmark")
+    start_time = time.time()
+    base_url = job.get('targetUrl') or os.getenv("TARGET_URL", "")
+    try:
+        page = BasePage(driver)
+        steps(page, base_url.rstrip("/"))
+        result["status"] = "PASS"
+        result["message"] = page.wait_summary()
+    except Exception as e:
+        result["message"] = str(e)
+        result["errorStack"] = traceback.format_exc()
+        try:
+            result["screenshotBase64"] = capture_screenshot_async(driver)
+        except:
+            pass
+    result["duration"] = round(time.time() - start_time, 2)
+    return result
+
+def run_login(driver, job):
+    def steps(page, base_url):
+        page.driver.get(f"{base_url}/login.html")
+        page.type((By.ID, "username"), "bench")
+        page.type((By.ID, "password"), "bench")
+        page.click((By.ID, "submit"))
+        page.wait_text_present("Logged In Successfully")
+    return _run(driver, job, "Benchmark Login", steps)
+
+def run_navigation(driver, job):
+    def steps(page, base_url):
+        page.driver.get(f"{base_url}/index.html")
+        page.click((By.ID, "to-list"))
+        page.wait_url_contains("list.html")
+        page.wait_dom_stable()
+    return _run(driver, job, "Benchmark Navigation", steps)
+
+def run_list(driver, job):
+    def steps(page, base_url):
+        page.driver.get(f"{base_url}/list.html")
+        page.wait_visible((By.ID, "item-99"))
+    return _run(driver, job, "Benchmark List", steps)
@@ -2,23 +2,16 @@ import time
 import traceback
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from utils import resize_and_encode_screenshot
+from utils import capture_screenshot_async
+from base_page import BasePage
+from result_model import TestResult
 
 def run_login_test(driver):
     """
     Executes the login test scenarios.
     Returns a dict with test results.
     """
-    result = {
-        "testName": "Login Test",
-        "status": "FAIL",
-        "message": "",
-        "duration": 0,
-        "screenshotBase64": "",
-        "errorStack": "",
-        "browser": driver.name,
-        "environment": "local"
-    }
+    result = TestResult.new(driver, "Login Test")
     
     start_time = time.time()
     
@@ -33,22 +26,24 @@ def run_login_test(driver):
         # 3. Click Login
         driver.find_element(By.ID, "submit").click()
         
-        # 4. Verify Success
-        time.sleep(2) # Wait for load
-        if "Logged In Successfully" in driver.page_source:
+        # 4. Verify Success (waits only as long as the page needs)
+        page = BasePage(driver)
+        success = page.wait_text_present("Logged In Successfully", raise_on_timeout=False)
+        print(f"  {page.wait_summary()}")
+        if success:
             result["status"] = "PASS"
             result["message"] = "Login successful"
         else:
             result["status"] = "FAIL"
             result["message"] = "Login failed: Success message not found"
-            result["screenshotBase64"] = resize_and_encode_screenshot(driver)
+            result["screenshotBase64"] = capture_screenshot_async(driver)
 
     except Exception as e:
         result["status"] = "FAIL"
         result["message"] = str(e)
         result["errorStack"] = traceback.format_exc()
         try:
-            result["screenshotBase64"] = resize_and_encode_screenshot(driver)
+            result["screenshotBase64"] = capture_screenshot_async(driver)
         except:
             pass
 
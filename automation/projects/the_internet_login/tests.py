@@ -2,22 +2,15 @@ import time
 import traceback
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from utils import resize_and_encode_screenshot
+from base_page import BasePage
+from result_model import TestResult
+from visual_diff import capture_failure
 
 def run_login_test(driver):
     """
     Executes the login test for The-Internet Herokuapp.
     """
-    result = {
-        "testName": "Login Test (The-Internet)",
-        "status": "FAIL",
-        "message": "",
-        "duration": 0,
-        "screenshotBase64": "",
-        "errorStack": "",
-        "browser": driver.name,
-        "environment": "local"
-    }
+    result = TestResult.new(driver, "Login Test (The-Internet)")
     
     start_time = time.time()
     
@@ -32,22 +25,25 @@ def run_login_test(driver):
         # 3. Click Login
         driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
         
-        # 4. Verify Success
-        time.sleep(2) # Wait for load
-        if "You logged into a secure area!" in driver.page_source:
+        # 4. Verify Success (waits only as long as the page needs)
+        page = BasePage(driver)
+        success = page.wait_text_present("You logged into a secure area!", raise_on_timeout=False)
+        print(f"  {page.wait_summary()}")
+        if success:
             result["status"] = "PASS"
             result["message"] = "Login successful"
         else:
             result["status"] = "FAIL"
             result["message"] = "Login failed: Success message not found"
-            result["screenshotBase64"] = resize_and_encode_screenshot(driver)
+            # Only the tiles that differ from an approved "secure-area" baseline are uploaded, if there is one
+            capture_failure(result, driver, "secure-area")
 
     except Exception as e:
         result["status"] = "FAIL"
         result["message"] = str(e)
         result["errorStack"] = traceback.format_exc()
         try:
-            result["screenshotBase64"] = resize_and_encode_screenshot(driver)
+            capture_failure(result, driver, "secure-area")
         except:
             pass
 
@@ -0,0 +1,203 @@
+import json
+import base64
+from concurrent.futures import Future
+from utils import EncodedScreenshot
+
+VALID_STATUSES = ("PASS", "FAIL", "FLAKY")
+PASSING_STATUSES = ("PASS", "FLAKY")  # FLAKY: failed first, passed on retry
+B64_CHUNK = 48 * 1024  # multiple of 3, so chunks encode independently
+
+
+class TestResult:
+    """
+    Compact result record shared by all projects.
+    Uses __slots__ (no per-instance dict) and keeps the screenshot as raw bytes
+    (memoryview / pending Future) until upload, where it is streamed as base64 in chunks
+    instead of being copied into one large JSON string.
+    Also supports dict-style access (result['status'], setdefault, get) so existing
+    tests that build plain dicts keep working.
+    """
+    __slots__ = ("testName", "status", "message", "duration", "screenshot", "screenshotRef",
+                 "errorStack", "browser", "environment", "projectId", "steps", "network", "extra")
+
+    # Dict key -> slot name, for the legacy payload field names
+    ALIASES = {"screenshotBase64": "screenshot"}
+
+    def __init__(self, testName, status="FAIL", message="", duration=0, screenshot=None, errorStack="",
+                 browser="", environment="local", projectId=None, steps=None, network=None, screenshotRef=None):
+        self.testName = testName
+        self.status = status
+        self.message = message
+        self.duration = duration
+        self.screenshot = screenshot
+        self.screenshotRef = screenshotRef
+        self.errorStack = errorStack
+        self.browser = browser
+        self.environment = environment
+        self.projectId = projectId
+        self.steps = steps
+        self.network = network
+        self.extra = None
+
+    @classmethod
+    def new(cls, driver, test_name, environment="local"):
+        return cls(test_name, browser=getattr(driver, "name", ""), environment=environment)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        result = cls(data.get("testName", "Unnamed Test"))
+        for key, value in data.items():
+            result[key] = value
+        return result
+
+    # --- dict compatibility ------------------------------------------
+
+    def _slot(self, key):
+        key = self.ALIASES.get(key, key)
+        return key if key in self.__slots__ and key != "extra" else None
+
+    def __getitem__(self, key):
+        slot = self._slot(key)
+        if slot:
+            return getattr(self, slot)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = self._slot(key)
+        if slot:
+            setattr(self, slot, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        slot = self._slot(key)
+        return getattr(self, slot) is not None if slot else bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    # --- validation / screenshot handling ------------------------------
+
+    def validate(self):
+        """
+        Normalises field types and rejects results the backend could not store.
+        """
+        if not isinstance(self.testName, str) or not self.testName:
+            raise ValueError("Result needs a non-empty testName")
+        if self.status not in VALID_STATUSES:
+            raise ValueError(f"Invalid result status '{self.status}' for {self.testName}")
+        try:
+            self.duration = float(self.duration or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid duration '{self.duration}' for {self.testName}")
+        self.message = "" if self.message is None else str(self.message)
+        self.errorStack = "" if self.errorStack is None else str(self.errorStack)
+        return self
+
+    def resolve_screenshot(self, uploader=None, timeout=30):
+        """
+        Waits for a pending screenshot. With an `uploader` (bytes, content_type -> reference or None)
+        the binary is uploaded and only the reference is kept; otherwise the bytes stay as a
+        memoryview to be streamed inline as base64.
+        """
+        value = self.screenshot
+        if isinstance(value, Future):
+            try:
+                value = value.result(timeout=timeout)
+            except Exception as e:
+                print(f"Screenshot encoding failed: {e}")
+                value = None
+
+        if isinstance(value, EncodedScreenshot):
+            ref = None
+            if uploader:
+                try:
+                    ref = uploader(value.data, value.content_type)
+                except Exception as e:
+                    print(f"Screenshot upload failed, inlining instead: {e}")
+            if ref:
+                self.screenshotRef = ref
+                value = None
+            else:
+                value = memoryview(value.data)
+        self.screenshot = value
+        return self
+
+    def resolve_visual(self, uploader=None):
+        """
+        Turns pending visual checks (visual_diff.VisualDiff) into their JSON payload,
+        uploading only the changed tiles and the diff mask.
+        """
+        checks = self.extra.get("visual") if self.extra else None
+        if checks:
+            resolved = []
+            for check in checks:
+                if hasattr(check, "to_payload"):
+                    try:
+                        check = check.to_payload(uploader)
+                    except Exception as e:
+                        print(f"Visual diff upload failed: {e}")
+                        check = {"name": check.name, "status": check.status, "score": check.score}
+                resolved.append(check)
+            self.extra["visual"] = resolved
+        return self
+
+    # --- streaming serialization ---------------------------------------
+
+    def iter_json(self):
+        """
+        Yields the JSON payload in pieces. The screenshot is base64-encoded chunk by chunk,
+        so no full-size base64 or JSON copy of it is ever built.
+        """
+        fields = [("testName", self.testName), ("status", self.status), ("message", self.message),
+                  ("duration", self.duration), ("errorStack", self.errorStack), ("browser", self.browser),
+                  ("environment", self.environment)]
+        for key in ("projectId", "screenshotRef", "steps", "network"):
+            if getattr(self, key) is not None:
+                fields.append((key, getattr(self, key)))
+        if self.extra:
+            fields.extend(self.extra.items())
+
+        yield "{"
+        for key, value in fields:
+            yield f"{json.dumps(key)}:{json.dumps(value)},"
+
+        yield '"screenshotBase64":'
+        shot = self.screenshot
+        if isinstance(shot, (bytes, bytearray, memoryview)):
+            view = memoryview(shot)
+            yield '"'
+            for start in range(0, len(view), B64_CHUNK):
+                yield base64.b64encode(view[start:start + B64_CHUNK]).decode("ascii")
+            yield '"'
+        else:
+            yield json.dumps(shot or "")
+        yield "}"
+
+
+def iter_json_array(results):
+    """
+    Streams a list of results as one JSON array, encoded to bytes for the HTTP body.
+    """
+    yield b"["
+    for index, result in enumerate(results):
+        if index:
+            yield b","
+        for piece in result.iter_json():
+            yield piece.encode("utf-8")
+    yield b"]"
@@ -0,0 +1,88 @@
+import os
+import time
+import threading
+import traceback
+from tracing import span
+from event_stream import EVENTS
+
+CASE_RETRIES = int(os.getenv("CASE_RETRIES", "0"))  # Extra attempts for a failing case or run_* function (opt-in)
+RETRY_BUDGET = int(os.getenv("RETRY_BUDGET", "5"))  # Extra attempts allowed per job, across all its cases
+RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", "2"))  # Seconds before the first retry, doubled for each further one
+RETRY_FRESH_DRIVER = os.getenv("RETRY_FRESH_DRIVER", "false").lower() == "true"  # Start a new browser for each retry
+
+
+def handles_retries(func):
+    """
+    Marks an entry function that retries its own cases (a suite dispatcher),
+    so the runner does not rerun it as a whole.
+    """
+    func.handles_retries = True
+    return func
+
+
+class RetryPolicy:
+    """
+    Reruns failed cases, never whole suites: each case gets up to `retries` extra attempts,
+    limited by a `budget` shared by all cases of the job, with exponential backoff and
+    optionally a fresh driver per retry. A case that fails and then passes is reported as FLAKY.
+    Callers without a driver of their own (isolated cases, see case_isolation.py) get attempt(None).
+    """
+    def __init__(self, retries=CASE_RETRIES, budget=RETRY_BUDGET, backoff=RETRY_BACKOFF, fresh=RETRY_FRESH_DRIVER):
+        self.retries = retries
+        self.budget = budget
+        self.backoff = backoff
+        self.fresh = fresh
+        self.lock = threading.Lock()
+
+    def take_budget(self):
+        with self.lock:
+            if self.budget <= 0:
+                return False
+            self.budget -= 1
+            return True
+
+    def run(self, name, attempt, driver, profile=None):
+        """
+        Calls `attempt(driver)` until it returns a passing result or retries run out.
+        Exceptions count as failures. Returns the last result, marked FLAKY when a retry passed.
+        """
+        failures = []
+        attempts = 0
+        for number in range(self.retries + 1):
+            if number:
+                if not self.take_budget():
+                    print(f"  Retry budget exhausted. Not retrying {name}.")
+                    break
+                delay = self.backoff * (2 ** (number - 1))
+                print(f"  Retrying {name} in {delay:.0f}s (attempt {number + 1}/{self.retries + 1})...")
+                EVENTS.emit("case.retry", name=name, attempt=number + 1, delay=delay)
+                time.sleep(delay)
+
+            attempts += 1
+            try:
+                with span("attempt", case=name, number=number + 1):
+                    if number and self.fresh and driver is not None:
+                        from driver_manager import fresh_driver
+                        with fresh_driver(profile) as retry_driver:
+                            result = attempt(retry_driver)
+                    else:
+                        result = attempt(driver)
+            except Exception as e:
+                result = {
+                    "testName": name,
+                    "status": "FAIL",
+                    "message": f"Attempt {number + 1} raised: {e}",
+                    "errorStack": traceback.format_exc()
+                }
+
+            if 'rowResults' in result:
+                break  # Data-driven case: its failed rows were already retried one by one
+            if result['status'] == "PASS":
+                if failures:
+                    result['status'] = "FLAKY"
+                    result['message'] = f"Passed on attempt {number + 1} after failing: {failures[-1]}. {result.get('message', '')}".strip()
+                break
+            failures.append(str(result.get('message') or "no message")[:200])
+
+        result['attempts'] = attempts
+        return result
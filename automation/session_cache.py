@@ -0,0 +1,94 @@
+import os
+import time
+import threading
+from urllib.parse import urlparse
+
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE", "true").lower() == "true"
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "900"))  # Seconds a snapshot may be reused
+
+_snapshots = {}  # (origin, account) -> snapshot dict
+_lock = threading.Lock()
+
+
+def _origin(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def capture_session(driver, base_url, account):
+    """
+    Snapshots cookies and local/session storage of a logged-in driver for (base_url, account).
+    Kept in memory only: snapshots hold live auth tokens and are never written to disk.
+    """
+    if not SESSION_CACHE_ENABLED:
+        return
+    try:
+        storage = driver.execute_script(
+            "return {local: Object.assign({}, window.localStorage), session: Object.assign({}, window.sessionStorage)};"
+        )
+        snapshot = {
+            "cookies": driver.get_cookies(),
+            "localStorage": storage.get("local", {}),
+            "sessionStorage": storage.get("session", {}),
+            "capturedAt": time.time(),
+        }
+    except Exception as e:
+        print(f"[SessionCache] Could not capture session: {e}")
+        return
+    with _lock:
+        _snapshots[(_origin(base_url), account)] = snapshot
+    print(f"[SessionCache] Captured session for {account} @ {_origin(base_url)}")
+
+
+def invalidate_session(base_url, account):
+    with _lock:
+        _snapshots.pop((_origin(base_url), account), None)
+
+
+def restore_session(driver, base_url, account, validate):
+    """
+    Restores a cached snapshot into `driver` and checks it with `validate(driver) -> bool`.
+    Returns True when the restored session is accepted. Expired or rejected snapshots
+    are dropped and False is returned so the caller falls back to a real login.
+    """
+    if not SESSION_CACHE_ENABLED:
+        return False
+    key = (_origin(base_url), account)
+    with _lock:
+        snapshot = _snapshots.get(key)
+    if not snapshot:
+        return False
+    if time.time() - snapshot["capturedAt"] > SESSION_CACHE_TTL:
+        print(f"[SessionCache] Snapshot for {account} expired.")
+        invalidate_session(base_url, account)
+        return False
+
+    try:
+        # Cookies and storage can only be set while on the target origin
+        driver.get(key[0])
+        for cookie in snapshot["cookies"]:
+            cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                cookie.pop("domain", None)  # host-only cookie: let the browser default it
+                driver.add_cookie(cookie)
+        driver.execute_script(
+            "var s = arguments[0];"
+            "Object.keys(s.local).forEach(function (k) { window.localStorage.setItem(k, s.local[k]); });"
+            "Object.keys(s.session).forEach(function (k) { window.sessionStorage.setItem(k, s.session[k]); });",
+            {"local": snapshot["localStorage"], "session": snapshot["sessionStorage"]},
+        )
+        if validate(driver):
+            print(f"[SessionCache] Reused session for {account} (login skipped)")
+            return True
+    except Exception as e:
+        print(f"[SessionCache] Restore failed: {e}")
+
+    print(f"[SessionCache] Snapshot for {account} rejected. Falling back to real login.")
+    invalidate_session(base_url, account)
+    try:
+        driver.delete_all_cookies()
+    except Exception:
+        pass
+    return False
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "").lower()  # "", "jsonl" or "chrome"
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(os.path.dirname(__file__), "traces"))
+
+_local = threading.local()
+_listeners = []  # Called with (name, duration, attrs) when a span ends (see event_stream.py)
+
+
+class Trace:
+    """
+    Collects timed spans for one job.
+    Spans may be recorded from several threads (shards, screenshot encoder), so access is locked.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.spans = []  # dicts: name, start, duration, tid, attrs
+        self.lock = threading.Lock()
+
+    def record(self, name, start, duration, attrs=None):
+        with self.lock:
+            self.spans.append({
+                "name": name,
+                "start": start,
+                "duration": duration,
+                "tid": threading.get_ident(),
+                "attrs": attrs or {},
+            })
+
+    def mark(self):
+        """
+        Position to pass to breakdown() later, e.g. before running one test.
+        """
+        with self.lock:
+            return len(self.spans)
+
+    def breakdown(self, since=0, thread_only=True):
+        """
+        Compact per-step timing {span name: total seconds} for spans recorded after `since`.
+        With `thread_only`, spans from other threads (e.g. parallel shards) are ignored.
+        """
+        tid = threading.get_ident()
+        steps = {}
+        with self.lock:
+            spans = self.spans[since:]
+        for span in spans:
+            if thread_only and span["tid"] != tid:
+                continue
+            steps[span["name"]] = round(steps.get(span["name"], 0) + span["duration"], 3)
+        return steps
+
+    def export(self, fmt=TRACE_EXPORT, directory=TRACE_DIR):
+        """
+        Writes the trace as JSON lines (one span per line) or Chrome trace format
+        (open in chrome://tracing or Perfetto). Returns the file path, or None when export is off.
+        """
+        if fmt not in ("jsonl", "chrome"):
+            return None
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))}-{self.name}")
+        with self.lock:
+            spans = list(self.spans)
+
+        if fmt == "jsonl":
+            path = base + ".jsonl"
+            with open(path, "w") as f:
+                for span in spans:
+                    f.write(json.dumps({**span, "trace": self.name}) + "\n")
+        else:
+            path = base + ".trace.json"
+            pid = os.getpid()
+            events = [{
+                "name": span["name"],
+                "ph": "X",
+                "ts": int(span["start"] * 1_000_000),
+                "dur": int(span["duration"] * 1_000_000),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": span["attrs"],
+            } for span in spans]
+            with open(path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+def start_trace(name):
+    """
+    Starts a new trace and makes it current for this thread.
+    """
+    trace = Trace(name)
+    _local.trace = trace
+    return trace
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+def activate(trace):
+    """
+    Makes an existing trace current in this thread (used to propagate a job's trace to helper threads).
+    """
+    _local.trace = trace
+
+def end_trace():
+    """
+    Detaches the current trace from this thread and exports it if TRACE_EXPORT is set.
+    """
+    trace = current_trace()
+    _local.trace = None
+    if trace:
+        try:
+            path = trace.export()
+            if path:
+                print(f"Trace written to {path}")
+        except Exception as e:
+            print(f"Failed to export trace: {e}")
+    return trace
+
+def add_listener(listener):
+    _listeners.append(listener)
+
+@contextmanager
+def span(name, trace=None, **attrs):
+    """
+    Times the enclosed block and records it on `trace` (default: this thread's current trace).
+    A no-op when no trace is active.
+    """
+    trace = trace or current_trace()
+    if trace is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        duration = time.time() - start
+        trace.record(name, start, duration, attrs)
+        for listener in _listeners:
+            try:
+                listener(name, duration, attrs)
+            except Exception:
+                pass
+
+def traced(name):
+    """
+    Decorator form of span().
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
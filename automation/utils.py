@@ -1,24 +1,97 @@
 import base64
 import os
+import shutil
 from PIL import Image
 import io
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from browser_profiles import get_profile, build_options, apply_runtime_settings
+from network_layer import release_cache_dir
+from tracing import span, current_trace
 
-def resize_and_encode_screenshot(driver, max_width=720):
+def create_driver(profile=None):
     """
-    Captures screenshot, resizes it, and returns base64 string.
+    Starts a new Chrome WebDriver session using a named browser profile (see browser_profiles.py).
+    The driver carries `profile_name` and `user_data_dir` so it can be matched and cleaned up later.
+    """
+    name, settings = get_profile(profile)
+    options, user_data_dir, cache_lease = build_options(settings)
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception:
+        if cache_lease is not None:
+            release_cache_dir(cache_lease)
+        if user_data_dir:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+        raise
+    apply_runtime_settings(driver, settings)
+    driver.profile_name = name
+    driver.user_data_dir = user_data_dir
+    driver.cache_lease = cache_lease
+    return driver
+
+# Screenshot encoding settings
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "PNG").upper()  # PNG, JPEG or WEBP
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "80"))  # JPEG/WEBP only
+SCREENSHOT_RESAMPLE = os.getenv("SCREENSHOT_RESAMPLE", "BILINEAR").upper()  # NEAREST, BILINEAR, BICUBIC, LANCZOS
+SCREENSHOT_WORKERS = int(os.getenv("SCREENSHOT_WORKERS", "2"))
+
+_SCREENSHOT_EXECUTOR = ThreadPoolExecutor(max_workers=SCREENSHOT_WORKERS, thread_name_prefix="screenshot")
+
+EncodedScreenshot = namedtuple("EncodedScreenshot", ["data", "content_type"])
+
+def encode_screenshot_bytes(png_data, max_width=720, image_format=None, quality=None, resample=None, trace=None):
+    """
+    Resizes raw PNG bytes and re-encodes them. Returns an EncodedScreenshot(data, content_type).
     """
-    png_data = driver.get_screenshot_as_png()
+    with span("screenshot.encode", trace=trace):
+        return _encode_screenshot_bytes(png_data, max_width, image_format, quality, resample)
+
+def _encode_screenshot_bytes(png_data, max_width, image_format, quality, resample):
+    image_format = (image_format or SCREENSHOT_FORMAT).upper()
+    quality = quality or SCREENSHOT_QUALITY
+    resample = getattr(Image.Resampling, (resample or SCREENSHOT_RESAMPLE).upper())
+
     image = Image.open(io.BytesIO(png_data))
-    
+
     # Resize if needed
     if image.width > max_width:
         ratio = max_width / float(image.width)
         new_height = int((float(image.height) * float(ratio)))
-        image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
-    
+        image = image.resize((max_width, new_height), resample)
+
     # Convert back to bytes
     buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
-    
-    return img_str
+    if image_format == "PNG":
+        image.save(buffer, format="PNG")
+    else:
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(buffer, format=image_format, quality=quality)
+    return EncodedScreenshot(buffer.getvalue(), f"image/{image_format.lower()}")
+
+def encode_screenshot(png_data, max_width=720, **kwargs):
+    """
+    Resizes raw PNG bytes and returns them re-encoded as a base64 string.
+    """
+    return base64.b64encode(encode_screenshot_bytes(png_data, max_width, **kwargs).data).decode("utf-8")
+
+def capture_screenshot_async(driver, max_width=720):
+    """
+    Grabs the raw PNG from the browser and returns immediately.
+    Resize/encode runs on a background pool; the returned Future resolves to an EncodedScreenshot.
+    It can be stored directly in a result: the uploader waits for it (TestResult.resolve_screenshot).
+    """
+    with span("screenshot.capture"):
+        png_data = driver.get_screenshot_as_png()
+    # The encoder thread records into the caller's trace
+    return _SCREENSHOT_EXECUTOR.submit(encode_screenshot_bytes, png_data, max_width, trace=current_trace())
+
+def resize_and_encode_screenshot(driver, max_width=720):
+    """
+    Captures screenshot, resizes it, and returns base64 string.
+    """
+    with span("screenshot.capture"):
+        png_data = driver.get_screenshot_as_png()
+    return encode_screenshot(png_data, max_width)
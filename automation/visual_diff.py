@@ -0,0 +1,245 @@
+import io
+import os
+import re
+import json
+import time
+import base64
+import hashlib
+import threading
+import numpy as np
+from PIL import Image, ImageChops
+from tracing import span
+
+VISUAL_BASELINE_DIR = os.getenv("VISUAL_BASELINE_DIR") or os.path.join(os.path.dirname(__file__), "baselines")
+VISUAL_UPDATE_BASELINES = os.getenv("VISUAL_UPDATE_BASELINES", "false").lower() == "true"  # Approve current frames as baselines
+VISUAL_TILE_SIZE = int(os.getenv("VISUAL_TILE_SIZE", "32"))  # Pixels per tile side
+VISUAL_PIXEL_THRESHOLD = int(os.getenv("VISUAL_PIXEL_THRESHOLD", "24"))  # Channel delta (0-255) below which a pixel counts as unchanged
+VISUAL_MAX_DIFF = float(os.getenv("VISUAL_MAX_DIFF", "0.001"))  # Changed-pixel ratio tolerated before a check fails
+VISUAL_LAYOUT_DISTANCE = int(os.getenv("VISUAL_LAYOUT_DISTANCE", "24"))  # Hash bits (of 64) beyond which frames are not compared pixel by pixel
+VISUAL_MAX_TILES = int(os.getenv("VISUAL_MAX_TILES", "64"))  # More changed tiles than this: upload the cropped region instead
+
+_lock = threading.Lock()
+
+
+def pixel_digest(image):
+    return hashlib.sha1(image.tobytes()).hexdigest()
+
+
+def perceptual_hash(image, size=8):
+    """
+    Difference hash (dHash): one bit per horizontally adjacent pair of a (size+1) x size grayscale thumbnail.
+    Similar frames differ in few bits; unrelated ones in about half.
+    """
+    small = image.convert("L").resize((size + 1, size), Image.Resampling.BILINEAR)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            offset = row * (size + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+
+def hash_distance(first, second):
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def _png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _channel_delta(baseline, current):
+    """
+    Largest per-channel difference of every pixel, as an "L" image (computed in C by Pillow).
+    """
+    red, green, blue = ImageChops.difference(baseline, current).split()
+    return ImageChops.lighter(ImageChops.lighter(red, green), blue)
+
+
+def diff_images(baseline, current, tile=VISUAL_TILE_SIZE, threshold=VISUAL_PIXEL_THRESHOLD):
+    """
+    Pixel diff of two RGB images of the same size.
+    Returns (mask, changed) where mask is an "L" image (255 = changed pixel) and
+    changed maps the (x, y) origin of every changed tile to its number of changed pixels.
+    """
+    with span("visual.diff"):
+        mask = np.asarray(_channel_delta(baseline, current)) > threshold
+        height, width = mask.shape
+        padded = np.pad(mask, ((0, -height % tile), (0, -width % tile)))
+        counts = padded.reshape(padded.shape[0] // tile, tile, padded.shape[1] // tile, tile).sum(axis=(1, 3))
+        changed = {(int(col) * tile, int(row) * tile): int(counts[row, col]) for row, col in zip(*np.nonzero(counts))}
+        return Image.fromarray(mask.astype(np.uint8) * 255), changed
+
+
+class VisualDiff:
+    """
+    Outcome of one visual check. Holds images until the result is uploaded, where
+    to_payload() sends only the changed tiles and the diff mask (see TestResult.resolve_visual).
+    """
+    def __init__(self, name, status, score=0.0, distance=0, size=None, bbox=None, mask=None, crop=None, tiles=None):
+        self.name = name
+        self.status = status  # identical, passed, changed, new or approved
+        self.score = score  # Share of changed pixels (1.0 when the frames are not comparable)
+        self.distance = distance
+        self.size = size
+        self.bbox = bbox  # Region of change (left, top, right, bottom)
+        self.mask = mask
+        self.crop = crop  # Current frame cropped to bbox
+        self.tiles = tiles or []  # [(x, y, image)] changed tiles of the current frame
+
+    @property
+    def passed(self):
+        return self.status != "changed"
+
+    def to_payload(self, uploader=None):
+        payload = {"name": self.name, "status": self.status, "score": round(self.score, 6),
+                   "hashDistance": self.distance, "size": self.size, "bbox": self.bbox}
+        if self.status != "changed":
+            return payload
+
+        if uploader:
+            payload["maskRef"] = uploader(_png(self.mask.convert("1")), "image/png") if self.mask else None
+            if self.tiles and len(self.tiles) <= VISUAL_MAX_TILES:
+                refs = [uploader(_png(image), "image/png") for _, _, image in self.tiles]
+                if all(refs):
+                    payload["tileSize"] = VISUAL_TILE_SIZE
+                    payload["tiles"] = [{"x": x, "y": y, "w": image.width, "h": image.height, "ref": ref}
+                                        for (x, y, image), ref in zip(self.tiles, refs)]
+                    return payload
+            crop_ref = uploader(_png(self.crop), "image/png") if self.crop else None
+            if crop_ref:
+                payload["cropRef"] = crop_ref
+                return payload
+
+        # No artifact store: inline a small version of the changed region only
+        from utils import encode_screenshot_bytes
+        if self.crop:
+            payload["cropBase64"] = base64.b64encode(encode_screenshot_bytes(_png(self.crop)).data).decode("ascii")
+        return payload
+
+
+class BaselineStore:
+    """
+    Approved frames per case, as PNG files plus a small JSON with their pixel digest (identical
+    frames are recognised without decoding the baseline) and perceptual hash (see compare).
+    """
+    def __init__(self, root=VISUAL_BASELINE_DIR):
+        self.root = root
+
+    def _paths(self, key, name):
+        directory = os.path.join(self.root, re.sub(r"[^\w-]+", "_", key))
+        stem = os.path.join(directory, re.sub(r"[^\w-]+", "_", name))
+        return directory, f"{stem}.png", f"{stem}.json"
+
+    def meta(self, key, name):
+        _, _, meta_path = self._paths(key, name)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def image(self, key, name):
+        _, image_path, _ = self._paths(key, name)
+        with Image.open(image_path) as image:
+            return image.convert("RGB")
+
+    def approve(self, key, name, image, digest=None, phash=None):
+        directory, image_path, meta_path = self._paths(key, name)
+        meta = {"digest": digest or pixel_digest(image), "hash": phash or perceptual_hash(image),
+                "size": list(image.size), "approvedAt": time.time()}
+        with _lock:
+            os.makedirs(directory, exist_ok=True)
+            # Temp file + rename: parallel shards never read a half-written baseline
+            for path, write in ((image_path, lambda f: image.save(f, format="PNG")),
+                                (meta_path, lambda f: f.write(json.dumps(meta).encode()))):
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    write(f)
+                os.replace(tmp_path, path)
+
+
+def compare(current, key, name, store=None, approve=True):
+    """
+    Compares a frame with the approved baseline `key`/`name`:
+    - same pixel digest: identical, nothing else is computed (the baseline is not even decoded);
+    - perceptual hashes far apart or a different size: the frames are not comparable and the whole frame counts as changed;
+    - otherwise a tile diff locates the changed pixels.
+    The perceptual hash never passes a frame on its own: nearby hashes also hide small text changes.
+    Without a baseline (or with VISUAL_UPDATE_BASELINES) the frame becomes the baseline, unless
+    `approve` is False: then None is returned.
+    """
+    store = store or BaselineStore()
+    current = current.convert("RGB")
+    digest = pixel_digest(current)
+    phash = perceptual_hash(current)
+    meta = store.meta(key, name)
+
+    if (meta is None or VISUAL_UPDATE_BASELINES) and not approve:
+        return None
+    if meta is None or VISUAL_UPDATE_BASELINES:
+        store.approve(key, name, current, digest, phash)
+        return VisualDiff(name, "approved" if meta else "new", size=list(current.size))
+    if meta.get("digest") == digest:
+        return VisualDiff(name, "identical", size=list(current.size))
+
+    distance = hash_distance(meta["hash"], phash)
+    full = (0, 0) + current.size
+    if list(current.size) != meta.get("size") or distance > VISUAL_LAYOUT_DISTANCE:
+        return VisualDiff(name, "changed", 1.0, distance, list(current.size), list(full), crop=current)
+
+    mask, changed = diff_images(store.image(key, name), current)
+    changed_pixels = sum(changed.values())
+    score = changed_pixels / float(current.width * current.height)
+    bbox = mask.getbbox()
+    if not bbox:
+        return VisualDiff(name, "passed", 0.0, distance, list(current.size))
+    status = "changed" if score > VISUAL_MAX_DIFF else "passed"
+    tiles = [(x, y, current.crop((x, y, min(x + VISUAL_TILE_SIZE, current.width), min(y + VISUAL_TILE_SIZE, current.height))))
+             for x, y in sorted(changed, key=lambda origin: (origin[1], origin[0]))] if status == "changed" else []
+    return VisualDiff(name, status, score, distance, list(current.size), list(bbox), mask, current.crop(bbox), tiles)
+
+
+def check_visual(result, driver, name, key=None):
+    """
+    Screenshots the page and compares it with the approved baseline `name` of this case
+    (`key` defaults to the result's test name). The diff is attached to result['visual'];
+    a check beyond VISUAL_MAX_DIFF fails the result. Returns the VisualDiff.
+    """
+    key = key or result["testName"]
+    with span("screenshot.capture"):
+        png_data = driver.get_screenshot_as_png()
+    with span("visual.compare", check=name):
+        with Image.open(io.BytesIO(png_data)) as image:
+            diff = compare(image, key, name)
+    result.setdefault("visual", [])
+    result["visual"].append(diff)
+    print(f"  Visual check '{name}': {diff.status} ({diff.score:.4%} changed, hash distance {diff.distance})")
+    if not diff.passed:
+        result["status"] = "FAIL"
+        result["message"] = f"{result.get('message', '')} Visual check '{name}' changed {diff.score:.2%} of the page.".strip()
+    return diff
+
+
+def capture_failure(result, driver, name, key=None):
+    """
+    Failure screenshot as a diff against the approved baseline `name` of this case: only the
+    changed tiles and the mask are uploaded (as result['visual']) instead of the whole frame.
+    Without an approved baseline the whole screenshot is captured as before. Never approves a frame.
+    """
+    from utils import capture_screenshot_async
+
+    key = key or result["testName"]
+    if VISUAL_UPDATE_BASELINES or BaselineStore().meta(key, name) is None:
+        result["screenshotBase64"] = capture_screenshot_async(driver)
+        return None
+    with span("screenshot.capture"):
+        png_data = driver.get_screenshot_as_png()
+    with span("visual.compare", check=name):
+        with Image.open(io.BytesIO(png_data)) as image:
+            diff = compare(image, key, name, approve=False)
+    result.setdefault("visual", [])
+    result["visual"].append(diff)
+    return diff
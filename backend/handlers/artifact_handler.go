@@ -0,0 +1,77 @@
+package handlers
+
+import (
+	"context"
+	"crypto/sha256"
+	"encoding/hex"
+	"time"
+
+	"web-automation-dashboard/database"
+	"web-automation-dashboard/models"
+	"web-automation-dashboard/utils"
+
+	"github.com/gofiber/fiber/v2"
+	"go.mongodb.org/mongo-driver/bson"
+	"go.mongodb.org/mongo-driver/mongo/options"
+)
+
+// UploadArtifact stores a raw binary body under its SHA-256 hash.
+// Identical content is stored only once.
+func UploadArtifact(c *fiber.Ctx) error {
+	hash := c.Params("hash")
+	body := c.Body()
+	if len(body) == 0 {
+		return utils.SendError(c, fiber.StatusBadRequest, "Empty artifact")
+	}
+
+	sum := sha256.Sum256(body)
+	if hex.EncodeToString(sum[:]) != hash {
+		return utils.SendError(c, fiber.StatusBadRequest, "Artifact hash does not match content")
+	}
+
+	contentType := c.Get(fiber.HeaderContentType, "application/octet-stream")
+	data := make([]byte, len(body)) // fiber reuses the body buffer
+	copy(data, body)
+
+	// _id comes from the filter on insert; existing artifacts are left untouched
+	insert := bson.M{
+		"contentType": contentType,
+		"size":        len(data),
+		"data":        data,
+		"createdAt":   time.Now(),
+	}
+
+	opts := options.Update().SetUpsert(true)
+	_, err := database.DB.Collection("artifacts").UpdateOne(context.Background(), bson.M{"_id": hash}, bson.M{"$setOnInsert": insert}, opts)
+	if err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to save artifact")
+	}
+
+	return utils.SendSuccess(c, hash)
+}
+
+// HasArtifact answers HEAD requests so the worker can skip uploading known content
+func HasArtifact(c *fiber.Ctx) error {
+	count, err := database.DB.Collection("artifacts").CountDocuments(context.Background(), bson.M{"_id": c.Params("hash")})
+	if err != nil {
+		return c.SendStatus(fiber.StatusInternalServerError)
+	}
+	if count == 0 {
+		return c.SendStatus(fiber.StatusNotFound)
+	}
+	return c.SendStatus(fiber.StatusOK)
+}
+
+// GetArtifact serves the raw artifact content
+func GetArtifact(c *fiber.Ctx) error {
+	var artifact models.Artifact
+	err := database.DB.Collection("artifacts").FindOne(context.Background(), bson.M{"_id": c.Params("hash")}).Decode(&artifact)
+	if err != nil {
+		return utils.SendError(c, fiber.StatusNotFound, "Artifact not found")
+	}
+
+	c.Set(fiber.HeaderContentType, artifact.ContentType)
+	// Content-addressed: the same URL always serves the same bytes
+	c.Set(fiber.HeaderCacheControl, "public, max-age=31536000, immutable")
+	return c.Send(artifact.Data)
+}
@@ -0,0 +1,96 @@
+package handlers
+
+import (
+	"context"
+	"log"
+	"strconv"
+	"sync"
+	"time"
+
+	"web-automation-dashboard/database"
+	"web-automation-dashboard/models"
+	"web-automation-dashboard/utils"
+
+	"github.com/gofiber/fiber/v2"
+	"go.mongodb.org/mongo-driver/bson"
+	"go.mongodb.org/mongo-driver/mongo"
+	"go.mongodb.org/mongo-driver/mongo/options"
+)
+
+// Live events are only useful while a job runs and shortly after, so they expire
+const eventRetention = 7 * 24 * time.Hour
+const maxEventsPerRequest = 2000
+
+var eventIndexOnce sync.Once
+
+func ensureEventIndexes() {
+	eventIndexOnce.Do(func() {
+		_, err := database.DB.Collection("job_events").Indexes().CreateMany(context.Background(), []mongo.IndexModel{
+			{Keys: bson.D{{Key: "createdAt", Value: 1}}, Options: options.Index().SetExpireAfterSeconds(int32(eventRetention.Seconds()))},
+			{Keys: bson.D{{Key: "jobId", Value: 1}, {Key: "ts", Value: 1}}},
+		})
+		if err != nil {
+			log.Printf("Failed to create job event indexes: %v", err)
+		}
+	})
+}
+
+// IngestEvents stores one frame of progress events and log lines streamed by a worker
+func IngestEvents(c *fiber.Ctx) error {
+	var body struct {
+		WorkerID string            `json:"workerId"`
+		Dropped  int               `json:"dropped"` // Events the worker discarded because its buffer was full
+		Events   []models.JobEvent `json:"events"`
+	}
+
+	if err := c.BodyParser(&body); err != nil {
+		return utils.SendError(c, fiber.StatusBadRequest, "Invalid request body")
+	}
+	if body.Dropped > 0 {
+		log.Printf("Worker %s dropped %d event(s) under backpressure", body.WorkerID, body.Dropped)
+	}
+	if len(body.Events) == 0 {
+		return utils.SendSuccess(c, fiber.Map{"received": 0})
+	}
+
+	ensureEventIndexes()
+	now := time.Now()
+	docs := make([]interface{}, 0, len(body.Events))
+	for _, event := range body.Events {
+		event.WorkerID = body.WorkerID
+		event.CreatedAt = now
+		docs = append(docs, event)
+	}
+
+	_, err := database.DB.Collection("job_events").InsertMany(context.Background(), docs, options.InsertMany().SetOrdered(false))
+	if err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to save events")
+	}
+
+	return utils.SendSuccess(c, fiber.Map{"received": len(docs)})
+}
+
+// GetJobEvents returns a job's events newer than ?since=<ts>, oldest first (polled by the live view)
+func GetJobEvents(c *fiber.Ctx) error {
+	since, _ := strconv.ParseFloat(c.Query("since", "0"), 64)
+	limit := c.QueryInt("limit", 500)
+	if limit <= 0 || limit > maxEventsPerRequest {
+		limit = maxEventsPerRequest
+	}
+
+	opts := options.Find().SetSort(bson.D{{Key: "ts", Value: 1}, {Key: "seq", Value: 1}}).SetLimit(int64(limit))
+	cursor, err := database.DB.Collection("job_events").Find(context.Background(), bson.M{
+		"jobId": c.Params("id"),
+		"ts":    bson.M{"$gt": since},
+	}, opts)
+	if err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to fetch events")
+	}
+
+	events := []models.JobEvent{}
+	if err := cursor.All(context.Background(), &events); err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to decode events")
+	}
+
+	return utils.SendSuccess(c, events)
+}
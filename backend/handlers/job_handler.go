@@ -2,6 +2,8 @@ package handlers
 
 import (
 	"context"
+	"log"
+	"sync"
 	"time"
 
 	"web-automation-dashboard/database"
@@ -11,15 +13,21 @@ import (
 	"github.com/gofiber/fiber/v2"
 	"go.mongodb.org/mongo-driver/bson"
 	"go.mongodb.org/mongo-driver/bson/primitive"
+	"go.mongodb.org/mongo-driver/mongo"
 	"go.mongodb.org/mongo-driver/mongo/options"
 )
 
 // QueueJob adds a new job to the queue
 func QueueJob(c *fiber.Ctx) error {
 	var body struct {
-		ProjectID  string `json:"projectId"`
-		Type       string `json:"type"`
-		TestFilter string `json:"testFilter"`
+		ProjectID      string      `json:"projectId"`
+		Type           string      `json:"type"`
+		TestFilter     string      `json:"testFilter"`
+		BrowserProfile string      `json:"browserProfile"`
+		Priority       string      `json:"priority"`
+		FailFast       bool        `json:"failFast"`
+		Selection      string      `json:"selection"`
+		Dataset        interface{} `json:"dataset"`
 	}
 
 	if err := c.BodyParser(&body); err != nil {
@@ -41,10 +49,14 @@ func QueueJob(c *fiber.Ctx) error {
 		jobType = "FullSuite"
 	}
 
-	// Prevent specific duplicate jobs (Same project, same status=Pending)
-	// This helps prevent accidental loops or double-submissions
+	priority := jobPriority(body.Priority, body.TestFilter)
+
+	// Prevent specific duplicate jobs (Same project, same priority class, status=Pending)
+	// This helps prevent accidental loops or double-submissions, while a single case
+	// can still be queued next to a pending full suite of the same project
 	count, _ := database.Collection.Database().Collection("jobs").CountDocuments(context.Background(), bson.M{
 		"projectId": projID,
+		"priority":  priority,
 		"status":    models.StatusPending,
 	})
 	if count > 0 {
@@ -52,56 +64,235 @@ func QueueJob(c *fiber.Ctx) error {
 	}
 
 	job := models.Job{
-		ProjectID:  projID,
-		Type:       jobType,
-		TestFilter: body.TestFilter,
-		Status:     models.StatusPending,
-		CreatedAt:  time.Now(),
-		UpdatedAt:  time.Now(),
+		ProjectID:      projID,
+		Type:           jobType,
+		TestFilter:     body.TestFilter,
+		BrowserProfile: body.BrowserProfile,
+		Priority:       priority,
+		FailFast:       body.FailFast,
+		Selection:      body.Selection,
+		Dataset:        body.Dataset,
+		Status:         models.StatusPending,
+		CreatedAt:      time.Now(),
+		UpdatedAt:      time.Now(),
 	}
 
 	// Debug Log
-	println("Queueing Job. Filter:", body.TestFilter, "Type:", jobType)
+	println("Queueing Job. Filter:", body.TestFilter, "Type:", jobType, "Priority:", priority)
 
 	_, err := database.Collection.Database().Collection("jobs").InsertOne(context.Background(), job)
 	if err != nil {
 		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to queue job")
 	}
+	NotifyJobQueued()
 
 	return utils.SendSuccess(c, "Job queued successfully")
 }
 
-// GetNextJob is called by the local runner poll
-func GetNextJob(c *fiber.Ctx) error {
+// jobPriority resolves the priority class of a queued job: an explicit class name,
+// otherwise interactive for a single case and suite for a full run
+func jobPriority(name string, testFilter string) int {
+	switch name {
+	case "interactive":
+		return models.PriorityInteractive
+	case "suite":
+		return models.PrioritySuite
+	case "nightly":
+		return models.PriorityNightly
+	}
+	if testFilter != "" {
+		return models.PriorityInteractive
+	}
+	return models.PrioritySuite
+}
+
+// Long-poll support: workers waiting in GetNextJob are woken up when a job is queued
+const maxLongPollWait = 30 * time.Second
+
+// Most jobs a worker may prefetch in one /jobs/next call
+const maxPrefetch = 10
+
+var (
+	jobSignalMu sync.Mutex
+	jobSignal   = make(chan struct{})
+)
+
+// NotifyJobQueued wakes up every worker currently long-polling /jobs/next
+func NotifyJobQueued() {
+	jobSignalMu.Lock()
+	close(jobSignal)
+	jobSignal = make(chan struct{})
+	jobSignalMu.Unlock()
+}
+
+func currentJobSignal() <-chan struct{} {
+	jobSignalMu.Lock()
+	defer jobSignalMu.Unlock()
+	return jobSignal
+}
+
+// Job leases: a worker that claims with a workerId must renew the lease, otherwise the job is requeued
+const defaultLeaseDuration = 60 * time.Second
+const maxLeaseDuration = 10 * time.Minute
+
+func leaseDuration(seconds int) time.Duration {
+	lease := time.Duration(seconds) * time.Second
+	if lease <= 0 {
+		return defaultLeaseDuration
+	}
+	if lease > maxLeaseDuration {
+		return maxLeaseDuration
+	}
+	return lease
+}
+
+// How often expired leases are looked for (see StartLeaseReaper)
+const leaseReapInterval = 10 * time.Second
+
+// requeueExpiredLeases puts Processing jobs whose lease ran out (crashed or disconnected worker) back to Pending.
+// Jobs claimed without a lease (legacy workers) are not touched. Returns the number of requeued jobs.
+func requeueExpiredLeases() int64 {
+	result, err := database.Collection.Database().Collection("jobs").UpdateMany(context.Background(), bson.M{
+		"status":         models.StatusProcessing,
+		"leaseExpiresAt": bson.M{"$lt": time.Now()},
+	}, bson.M{
+		"$set":   bson.M{"status": models.StatusPending, "updatedAt": time.Now()},
+		"$unset": bson.M{"workerId": "", "leaseExpiresAt": ""},
+	})
+	if err != nil {
+		log.Printf("Failed to requeue expired jobs: %v", err)
+		return 0
+	}
+	if result.ModifiedCount > 0 {
+		log.Printf("Requeued %d job(s) with expired leases", result.ModifiedCount)
+	}
+	return result.ModifiedCount
+}
+
+// StartLeaseReaper requeues jobs with expired leases from one background ticker and wakes up
+// the long-polling workers when it did, so waiting workers never scan for them themselves.
+func StartLeaseReaper() {
+	go func() {
+		for {
+			if requeueExpiredLeases() > 0 {
+				NotifyJobQueued()
+			}
+			time.Sleep(leaseReapInterval)
+		}
+	}()
+}
+
+// claimNextJob finds the most urgent Pending job (highest priority class, then oldest)
+// and updates it to Processing atomically.
+// With a workerId the job is leased to that worker for `lease`; with minPriority > 0 only jobs
+// of at least that class are claimed.
+// Returns nil when the queue is empty.
+func claimNextJob(workerID string, lease time.Duration, minPriority int) (*models.Job, error) {
 	var job models.Job
 
-	// Find the oldest Pending job and update it to Processing atomically
 	filter := bson.M{"status": models.StatusPending}
+	if minPriority > 0 {
+		filter["priority"] = bson.M{"$gte": minPriority}
+	}
+	set := bson.M{
+		"status":    models.StatusProcessing,
+		"updatedAt": time.Now(),
+	}
+	if workerID != "" {
+		set["workerId"] = workerID
+		set["leaseExpiresAt"] = time.Now().Add(lease)
+	}
 	update := bson.M{
-		"$set": bson.M{
-			"status":    models.StatusProcessing,
-			"updatedAt": time.Now(),
-		},
+		"$set": set,
+		"$inc": bson.M{"attempts": 1},
 	}
-	opts := options.FindOneAndUpdate().SetSort(bson.D{{Key: "createdAt", Value: 1}}).SetReturnDocument(options.After)
+	opts := options.FindOneAndUpdate().SetSort(bson.D{{Key: "priority", Value: -1}, {Key: "createdAt", Value: 1}}).SetReturnDocument(options.After)
 
 	err := database.Collection.Database().Collection("jobs").FindOneAndUpdate(context.Background(), filter, update, opts).Decode(&job)
 	if err != nil {
-		if err.Error() == "mongo: no documents in result" {
+		if err == mongo.ErrNoDocuments {
+			return nil, nil
+		}
+		return nil, err
+	}
+	return &job, nil
+}
+
+// GetNextJob is called by the local runner poll.
+// With ?wait=<seconds> the request blocks until a job arrives or the wait expires (long-poll).
+// With ?workerId=<id>&leaseSeconds=<n> the job is leased to that worker.
+// With ?limit=<n> up to n jobs are claimed at once and returned as a list (worker-side prefetch).
+// With ?minPriority=<class> lower classes are left for other workers (used by busy workers
+// that only look for jobs worth preempting for).
+func GetNextJob(c *fiber.Ctx) error {
+	workerID := c.Query("workerId")
+	minPriority := c.QueryInt("minPriority", 0)
+	limit := c.QueryInt("limit", 0)
+	if limit > maxPrefetch {
+		limit = maxPrefetch
+	}
+	lease := leaseDuration(c.QueryInt("leaseSeconds", 0))
+	wait := time.Duration(c.QueryInt("wait", 0)) * time.Second
+	if wait > maxLongPollWait {
+		wait = maxLongPollWait
+	}
+	deadline := time.Now().Add(wait)
+	c.Set("X-Long-Poll", "1")
+	touched := false
+
+	for {
+		// Grab the signal before querying so a job queued in between is not missed
+		signal := currentJobSignal()
+
+		jobs := []models.Job{}
+		for len(jobs) == 0 || len(jobs) < limit {
+			job, err := claimNextJob(workerID, lease, minPriority)
+			if err != nil {
+				if len(jobs) > 0 {
+					break
+				}
+				return utils.SendError(c, fiber.StatusInternalServerError, err.Error())
+			}
+			if job == nil {
+				break
+			}
+			jobs = append(jobs, *job)
+		}
+		if len(jobs) > 0 {
+			if limit > 0 {
+				return utils.SendSuccess(c, jobs)
+			}
+			return utils.SendSuccess(c, jobs[0])
+		}
+
+		remaining := time.Until(deadline)
+		if remaining <= 0 {
 			// No jobs available, not an error, just empty
 			return c.Status(fiber.StatusNoContent).JSON(fiber.Map{"message": "No jobs pending"})
 		}
-		return utils.SendError(c, fiber.StatusInternalServerError, err.Error())
-	}
 
-	return utils.SendSuccess(c, job)
+		// A waiting worker is alive, keep the dashboard status online (once per request)
+		if !touched {
+			markHeartbeat()
+			touchWorker(workerID)
+			touched = true
+		}
+
+		// Every writer that makes a job Pending calls NotifyJobQueued, so no periodic re-check is needed
+		select {
+		case <-signal:
+		case <-time.After(remaining):
+		}
+	}
 }
 
-// UpdateJobStatus updates the status of a job (called by runner)
+// UpdateJobStatus updates the status of a job (called by runner).
+// When a workerId is sent, only the worker holding the job may update it.
 func UpdateJobStatus(c *fiber.Ctx) error {
 	var body struct {
-		ID     string           `json:"id"`
-		Status models.JobStatus `json:"status"`
+		ID       string           `json:"id"`
+		Status   models.JobStatus `json:"status"`
+		WorkerID string           `json:"workerId"`
 	}
 
 	if err := c.BodyParser(&body); err != nil {
@@ -109,21 +300,92 @@ func UpdateJobStatus(c *fiber.Ctx) error {
 	}
 
 	objID, _ := primitive.ObjectIDFromHex(body.ID)
+	filter := bson.M{"_id": objID}
+	if body.WorkerID != "" {
+		filter["workerId"] = body.WorkerID
+	}
 	update := bson.M{
 		"$set": bson.M{
 			"status":    body.Status,
 			"updatedAt": time.Now(),
 		},
 	}
+	if body.Status == models.StatusCompleted || body.Status == models.StatusFailed {
+		update["$unset"] = bson.M{"leaseExpiresAt": ""}
+	}
 
-	_, err := database.Collection.Database().Collection("jobs").UpdateOne(context.Background(), bson.M{"_id": objID}, update)
+	result, err := database.Collection.Database().Collection("jobs").UpdateOne(context.Background(), filter, update)
 	if err != nil {
 		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to update job")
 	}
+	if body.WorkerID != "" && result.MatchedCount == 0 {
+		return utils.SendError(c, fiber.StatusConflict, "Job is not leased to this worker")
+	}
+	if body.Status == models.StatusPending && result.ModifiedCount > 0 {
+		NotifyJobQueued() // Handed back to the queue
+	}
 
 	return utils.SendSuccess(c, "Job status updated")
 }
 
+// RenewLease extends the lease of a job still held by the calling worker
+func RenewLease(c *fiber.Ctx) error {
+	var body struct {
+		ID           string `json:"id"`
+		WorkerID     string `json:"workerId"`
+		LeaseSeconds int    `json:"leaseSeconds"`
+	}
+
+	if err := c.BodyParser(&body); err != nil || body.WorkerID == "" {
+		return utils.SendError(c, fiber.StatusBadRequest, "Invalid request")
+	}
+
+	objID, _ := primitive.ObjectIDFromHex(body.ID)
+	result, err := database.Collection.Database().Collection("jobs").UpdateOne(context.Background(), bson.M{
+		"_id":      objID,
+		"workerId": body.WorkerID,
+		"status":   models.StatusProcessing,
+	}, bson.M{
+		"$set": bson.M{"leaseExpiresAt": time.Now().Add(leaseDuration(body.LeaseSeconds)), "updatedAt": time.Now()},
+	})
+	if err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to renew lease")
+	}
+	if result.MatchedCount == 0 {
+		return utils.SendError(c, fiber.StatusConflict, "Job is not leased to this worker")
+	}
+
+	return utils.SendSuccess(c, "Lease renewed")
+}
+
+// ReleaseWorkerJobs requeues the Processing jobs of one worker (called by a worker on startup
+// to recover its own jobs after a crash, without touching jobs held by other workers)
+func ReleaseWorkerJobs(c *fiber.Ctx) error {
+	var body struct {
+		WorkerID string `json:"workerId"`
+	}
+
+	if err := c.BodyParser(&body); err != nil || body.WorkerID == "" {
+		return utils.SendError(c, fiber.StatusBadRequest, "Invalid request")
+	}
+
+	result, err := database.Collection.Database().Collection("jobs").UpdateMany(context.Background(), bson.M{
+		"workerId": body.WorkerID,
+		"status":   models.StatusProcessing,
+	}, bson.M{
+		"$set":   bson.M{"status": models.StatusPending, "updatedAt": time.Now()},
+		"$unset": bson.M{"workerId": "", "leaseExpiresAt": ""},
+	})
+	if err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to release jobs")
+	}
+	if result.ModifiedCount > 0 {
+		NotifyJobQueued()
+	}
+
+	return utils.SendSuccess(c, fiber.Map{"released": result.ModifiedCount})
+}
+
 // ClearQueue removes all pending or processing jobs
 func ClearQueue(c *fiber.Ctx) error {
 	_, err := database.Collection.Database().Collection("jobs").DeleteMany(context.Background(), bson.M{
@@ -5,6 +5,8 @@ import (
 	"log"
 	"os"
 	"os/exec"
+	"strconv"
+	"sync"
 	"time"
 
 	"web-automation-dashboard/database"
@@ -13,9 +15,24 @@ import (
 
 	"github.com/gofiber/fiber/v2"
 	"go.mongodb.org/mongo-driver/bson"
+	"go.mongodb.org/mongo-driver/mongo"
 	"go.mongodb.org/mongo-driver/mongo/options"
 )
 
+var resultIndexOnce sync.Once
+
+func ensureResultIndexes() {
+	resultIndexOnce.Do(func() {
+		_, err := database.Collection.Indexes().CreateOne(context.Background(), mongo.IndexModel{
+			Keys:    bson.D{{Key: "uploadKey", Value: 1}},
+			Options: options.Index().SetUnique(true).SetSparse(true),
+		})
+		if err != nil {
+			log.Printf("Failed to create result upload index: %v", err)
+		}
+	})
+}
+
 func SaveResult(c *fiber.Ctx) error {
 	var result models.Result
 	if err := c.BodyParser(&result); err != nil {
@@ -32,6 +49,50 @@ func SaveResult(c *fiber.Ctx) error {
 	return utils.SendSuccess(c, "Result saved successfully")
 }
 
+// SaveResults stores a batch of results in one request (used by the worker's batched uploader).
+// With an X-Batch-Id header (and X-Batch-Offset for the later part of a split batch) each result
+// is upserted on its position in the batch, so a batch that is sent again (retry after a lost
+// response, replay from the worker's spool) does not store its results twice.
+func SaveResults(c *fiber.Ctx) error {
+	var results []models.Result
+	if err := c.BodyParser(&results); err != nil {
+		return utils.SendError(c, fiber.StatusBadRequest, "Invalid request body")
+	}
+	if len(results) == 0 {
+		return utils.SendSuccess(c, "No results to save")
+	}
+
+	now := time.Now()
+	batchID := c.Get("X-Batch-Id")
+	if batchID != "" {
+		ensureResultIndexes()
+		offset, _ := strconv.Atoi(c.Get("X-Batch-Offset"))
+		writes := make([]mongo.WriteModel, len(results))
+		for i := range results {
+			results[i].Timestamp = now
+			results[i].UploadKey = batchID + ":" + strconv.Itoa(offset+i)
+			writes[i] = mongo.NewReplaceOneModel().SetFilter(bson.M{"uploadKey": results[i].UploadKey}).SetReplacement(results[i]).SetUpsert(true)
+		}
+		if _, err := database.Collection.BulkWrite(context.Background(), writes); err != nil {
+			return utils.SendError(c, fiber.StatusInternalServerError, "Failed to save results")
+		}
+		return utils.SendSuccess(c, "Results saved successfully")
+	}
+
+	docs := make([]interface{}, len(results))
+	for i := range results {
+		results[i].Timestamp = now
+		docs[i] = results[i]
+	}
+
+	_, err := database.Collection.InsertMany(context.Background(), docs)
+	if err != nil {
+		return utils.SendError(c, fiber.StatusInternalServerError, "Failed to save results")
+	}
+
+	return utils.SendSuccess(c, "Results saved successfully")
+}
+
 func GetResults(c *fiber.Ctx) error {
 	ctx, cancel := context.WithTimeout(context.Background(), 10*time.Second)
 	defer cancel()
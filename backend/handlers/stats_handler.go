@@ -15,6 +15,7 @@ type Stats struct {
 	Total  int64 `json:"total"`
 	Passed int64 `json:"passed"`
 	Failed int64 `json:"failed"`
+	Flaky  int64 `json:"flaky"`
 }
 
 func GetStats(c *fiber.Ctx) error {
@@ -24,10 +25,12 @@ func GetStats(c *fiber.Ctx) error {
 	total, _ := database.Collection.CountDocuments(ctx, bson.M{})
 	passed, _ := database.Collection.CountDocuments(ctx, bson.M{"status": "PASS"})
 	failed, _ := database.Collection.CountDocuments(ctx, bson.M{"status": "FAIL"})
+	flaky, _ := database.Collection.CountDocuments(ctx, bson.M{"status": "FLAKY"})
 
 	return utils.SendSuccess(c, Stats{
 		Total:  total,
 		Passed: passed,
 		Failed: failed,
+		Flaky:  flaky,
 	})
 }
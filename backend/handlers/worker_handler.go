@@ -1,27 +1,79 @@
 package handlers
 
 import (
+	"context"
+	"sync"
 	"time"
 
+	"web-automation-dashboard/database"
+	"web-automation-dashboard/models"
+
 	"github.com/gofiber/fiber/v2"
+	"go.mongodb.org/mongo-driver/bson"
+	"go.mongodb.org/mongo-driver/mongo/options"
 )
 
-var lastHeartbeat time.Time
+const workerOnlineWindow = 15 * time.Second
 
-// RecordHeartbeat updates the last seen time of the worker
-func RecordHeartbeat(c *fiber.Ctx) error {
+// Heartbeats arrive on concurrent request goroutines
+var (
+	heartbeatMu   sync.Mutex
+	lastHeartbeat time.Time
+)
+
+// markHeartbeat records that a worker was seen (heartbeat or waiting long-poll)
+func markHeartbeat() {
+	heartbeatMu.Lock()
 	lastHeartbeat = time.Now()
+	heartbeatMu.Unlock()
+}
+
+// RecordHeartbeat updates the last seen time of the worker.
+// Workers that send a body ({workerId, hostname, totalSlots, freeSlots, browsers, projects})
+// are registered individually with their capacity.
+func RecordHeartbeat(c *fiber.Ctx) error {
+	markHeartbeat()
+
+	var worker models.Worker
+	if err := c.BodyParser(&worker); err == nil && worker.ID != "" {
+		worker.LastSeen = time.Now()
+		opts := options.Update().SetUpsert(true)
+		_, _ = database.DB.Collection("workers").UpdateOne(context.Background(), bson.M{"_id": worker.ID}, bson.M{"$set": worker}, opts)
+	}
+
 	return c.JSON(fiber.Map{
 		"success": true,
 		"message": "Heartbeat acknowledged",
 	})
 }
 
+// touchWorker refreshes a registered worker's lastSeen (e.g. while it long-polls for jobs)
+func touchWorker(workerID string) {
+	if workerID == "" {
+		return
+	}
+	_, _ = database.DB.Collection("workers").UpdateOne(context.Background(), bson.M{"_id": workerID}, bson.M{"$set": bson.M{"lastSeen": time.Now()}})
+}
+
 // GetWorkerStatus checks if the worker is active (seen in last 15s)
+// and lists the registered workers that are currently online.
 func GetWorkerStatus(c *fiber.Ctx) error {
-	isOnline := time.Since(lastHeartbeat) < 15*time.Second
+	heartbeatMu.Lock()
+	seen := lastHeartbeat
+	heartbeatMu.Unlock()
+	isOnline := time.Since(seen) < workerOnlineWindow
+
+	workers := []models.Worker{}
+	cursor, err := database.DB.Collection("workers").Find(context.Background(), bson.M{
+		"lastSeen": bson.M{"$gte": time.Now().Add(-workerOnlineWindow)},
+	})
+	if err == nil {
+		_ = cursor.All(context.Background(), &workers)
+	}
+
 	return c.JSON(fiber.Map{
 		"online":   isOnline,
-		"lastSeen": lastHeartbeat,
+		"lastSeen": seen,
+		"workers":  workers,
 	})
 }
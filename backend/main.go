@@ -5,6 +5,7 @@ import (
 	"os"
 
 	"web-automation-dashboard/database"
+	"web-automation-dashboard/handlers"
 	"web-automation-dashboard/routes"
 	"web-automation-dashboard/scheduler"
 	"web-automation-dashboard/utils"
@@ -29,6 +30,9 @@ func main() {
 	// 2.1 Start Scheduler
 	scheduler.StartCron()
 
+	// 2.2 Requeue jobs whose worker stopped renewing its lease
+	handlers.StartLeaseReaper()
+
 	// 3. Setup Fiber
 	app := fiber.New(fiber.Config{
 		ErrorHandler: func(c *fiber.Ctx, err error) error {
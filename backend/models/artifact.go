@@ -0,0 +1,12 @@
+package models
+
+import "time"
+
+// Artifact is a binary blob (e.g. a failure screenshot) keyed by the SHA-256 of its content
+type Artifact struct {
+	Hash        string    `json:"hash" bson:"_id"`
+	ContentType string    `json:"contentType" bson:"contentType"`
+	Size        int       `json:"size" bson:"size"`
+	Data        []byte    `json:"-" bson:"data"`
+	CreatedAt   time.Time `json:"createdAt" bson:"createdAt"`
+}
@@ -0,0 +1,20 @@
+package models
+
+import (
+	"time"
+
+	"go.mongodb.org/mongo-driver/bson/primitive"
+)
+
+// JobEvent is one progress event or log line streamed by a worker while it runs a job
+type JobEvent struct {
+	ID        primitive.ObjectID     `json:"id" bson:"_id,omitempty"`
+	JobID     string                 `json:"jobId" bson:"jobId"`
+	WorkerID  string                 `json:"workerId" bson:"workerId"`
+	Seq       int64                  `json:"seq" bson:"seq"`   // Per-worker sequence number
+	Timestamp float64                `json:"ts" bson:"ts"`     // Unix time on the worker
+	Kind      string                 `json:"kind" bson:"kind"` // job.started, case.started, step, wait, screenshot, case.finished, log, ...
+	Slot      string                 `json:"slot,omitempty" bson:"slot,omitempty"`
+	Data      map[string]interface{} `json:"data,omitempty" bson:"data,omitempty"`
+	CreatedAt time.Time              `json:"createdAt" bson:"createdAt"` // Events expire after a retention period
+}
@@ -15,13 +15,28 @@ const (
 	StatusFailed     JobStatus = "Failed"
 )
 
+// Priority classes: higher runs first, jobs of the same class run oldest first
+const (
+	PriorityNightly     = 1 // Scheduled full suites
+	PrioritySuite       = 2 // Full suites started from the dashboard
+	PriorityInteractive = 3 // Single cases started from the dashboard
+)
+
 type Job struct {
-	ID         primitive.ObjectID `json:"id" bson:"_id,omitempty"`
-	ProjectID  primitive.ObjectID `json:"projectId" bson:"projectId"`                       // Link to Project
-	Type       string             `json:"type" bson:"type"`                                 // e.g., "FullSuite", "LoginTest"
-	TestFilter string             `json:"testFilter,omitempty" bson:"testFilter,omitempty"` // Specific test function name
-	Status     JobStatus          `json:"status" bson:"status"`
-	CreatedAt  time.Time          `json:"createdAt" bson:"createdAt"`
-	UpdatedAt  time.Time          `json:"updatedAt" bson:"updatedAt"`
-	ResultID   primitive.ObjectID `json:"resultId,omitempty" bson:"resultId,omitempty"` // Link to Result if completed
+	ID             primitive.ObjectID `json:"id" bson:"_id,omitempty"`
+	ProjectID      primitive.ObjectID `json:"projectId" bson:"projectId"`                               // Link to Project
+	Type           string             `json:"type" bson:"type"`                                         // e.g., "FullSuite", "LoginTest"
+	TestFilter     string             `json:"testFilter,omitempty" bson:"testFilter,omitempty"`         // Specific test function name
+	BrowserProfile string             `json:"browserProfile,omitempty" bson:"browserProfile,omitempty"` // Overrides the project's browser profile
+	Priority       int                `json:"priority" bson:"priority"`                                 // Priority class (see Priority* constants)
+	FailFast       bool               `json:"failFast,omitempty" bson:"failFast,omitempty"`             // Stop a suite at its first failing case
+	Selection      string             `json:"selection,omitempty" bson:"selection,omitempty"`           // "all" or "changed" (only changed or last-failed cases)
+	Dataset        interface{}        `json:"dataset,omitempty" bson:"dataset,omitempty"`               // Data rows (or a CSV/JSON file next to the case) for a single data-driven case
+	Status         JobStatus          `json:"status" bson:"status"`
+	CreatedAt      time.Time          `json:"createdAt" bson:"createdAt"`
+	UpdatedAt      time.Time          `json:"updatedAt" bson:"updatedAt"`
+	ResultID       primitive.ObjectID `json:"resultId,omitempty" bson:"resultId,omitempty"`             // Link to Result if completed
+	WorkerID       string             `json:"workerId,omitempty" bson:"workerId,omitempty"`             // Worker holding the lease
+	LeaseExpiresAt *time.Time         `json:"leaseExpiresAt,omitempty" bson:"leaseExpiresAt,omitempty"` // Job is requeued if not renewed by then
+	Attempts       int                `json:"attempts,omitempty" bson:"attempts,omitempty"`             // Times the job was claimed
 }
@@ -7,10 +7,11 @@ import (
 )
 
 type Project struct {
-	ID        primitive.ObjectID `json:"id" bson:"_id,omitempty"`
-	Name      string             `json:"name" bson:"name"`
-	BaseURL   string             `json:"baseUrl" bson:"baseUrl"`
-	Directory string             `json:"directory,omitempty" bson:"directory,omitempty"` // Explicit folder name
-	CreatedAt time.Time          `json:"createdAt" bson:"createdAt"`
-	UpdatedAt time.Time          `json:"updatedAt" bson:"updatedAt"`
+	ID             primitive.ObjectID `json:"id" bson:"_id,omitempty"`
+	Name           string             `json:"name" bson:"name"`
+	BaseURL        string             `json:"baseUrl" bson:"baseUrl"`
+	Directory      string             `json:"directory,omitempty" bson:"directory,omitempty"`           // Explicit folder name
+	BrowserProfile string             `json:"browserProfile,omitempty" bson:"browserProfile,omitempty"` // Worker browser profile, e.g. "fast-headless"
+	CreatedAt      time.Time          `json:"createdAt" bson:"createdAt"`
+	UpdatedAt      time.Time          `json:"updatedAt" bson:"updatedAt"`
 }
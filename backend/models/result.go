@@ -8,14 +8,44 @@ import (
 
 type Result struct {
 	ID               primitive.ObjectID `json:"id" bson:"_id,omitempty"`
-	ProjectID        primitive.ObjectID `json:"projectId" bson:"projectId"` // Link to Project
+	UploadKey        string             `json:"-" bson:"uploadKey,omitempty"` // Batch id + position: a retried batch upload replaces instead of duplicating
+	ProjectID        primitive.ObjectID `json:"projectId" bson:"projectId"`   // Link to Project
 	TestName         string             `json:"testName" bson:"testName"`
-	Status           string             `json:"status" bson:"status"` // PASS, FAIL
+	Status           string             `json:"status" bson:"status"` // PASS, FAIL, FLAKY (passed on retry)
 	Message          string             `json:"message" bson:"message"`
 	Duration         float64            `json:"duration" bson:"duration"` // Seconds
 	Timestamp        time.Time          `json:"timestamp" bson:"timestamp"`
 	ScreenshotBase64 string             `json:"screenshotBase64" bson:"screenshotBase64"`
+	ScreenshotRef    string             `json:"screenshotRef,omitempty" bson:"screenshotRef,omitempty"` // Artifact hash, replaces inline base64
 	ErrorStack       string             `json:"errorStack" bson:"errorStack"`
 	Browser          string             `json:"browser" bson:"browser"`
-	Environment      string             `json:"environment" bson:"environment"` // local, production
+	Environment      string             `json:"environment" bson:"environment"`               // local, production
+	Steps            map[string]float64 `json:"steps,omitempty" bson:"steps,omitempty"`       // Per-step timing breakdown (seconds)
+	Network          map[string]int64   `json:"network,omitempty" bson:"network,omitempty"`   // Requests blocked / served from cache, bytes saved
+	Attempts         int                `json:"attempts,omitempty" bson:"attempts,omitempty"` // Runs including retries
+	Visual           []VisualCheck      `json:"visual,omitempty" bson:"visual,omitempty"`     // Screenshot comparisons against approved baselines
+}
+
+// VisualTile is one changed tile of a screenshot, stored as an artifact
+type VisualTile struct {
+	X   int    `json:"x" bson:"x"`
+	Y   int    `json:"y" bson:"y"`
+	W   int    `json:"w" bson:"w"`
+	H   int    `json:"h" bson:"h"`
+	Ref string `json:"ref" bson:"ref"` // Artifact hash
+}
+
+// VisualCheck is the outcome of one baseline comparison (see automation/visual_diff.py)
+type VisualCheck struct {
+	Name         string       `json:"name" bson:"name"`
+	Status       string       `json:"status" bson:"status"` // identical, passed, changed, new, approved
+	Score        float64      `json:"score" bson:"score"`   // Share of changed pixels
+	HashDistance int          `json:"hashDistance" bson:"hashDistance"`
+	Size         []int        `json:"size,omitempty" bson:"size,omitempty"`
+	BBox         []int        `json:"bbox,omitempty" bson:"bbox,omitempty"` // Region of change: left, top, right, bottom
+	TileSize     int          `json:"tileSize,omitempty" bson:"tileSize,omitempty"`
+	Tiles        []VisualTile `json:"tiles,omitempty" bson:"tiles,omitempty"` // Only the changed tiles are uploaded
+	MaskRef      string       `json:"maskRef,omitempty" bson:"maskRef,omitempty"`
+	CropRef      string       `json:"cropRef,omitempty" bson:"cropRef,omitempty"`
+	CropBase64   string       `json:"cropBase64,omitempty" bson:"cropBase64,omitempty"` // Inline crop when artifacts are unavailable
 }
@@ -0,0 +1,14 @@
+package models
+
+import "time"
+
+// Worker is an automation worker node registered through its heartbeat
+type Worker struct {
+	ID         string    `json:"workerId" bson:"_id"`
+	Hostname   string    `json:"hostname" bson:"hostname"`
+	TotalSlots int       `json:"totalSlots" bson:"totalSlots"`
+	FreeSlots  int       `json:"freeSlots" bson:"freeSlots"`
+	Browsers   []string  `json:"browsers" bson:"browsers"`
+	Projects   []string  `json:"projects" bson:"projects"`
+	LastSeen   time.Time `json:"lastSeen" bson:"lastSeen"`
+}
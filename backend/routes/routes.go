@@ -10,6 +10,12 @@ func SetupRoutes(app *fiber.App) {
 	api := app.Group("/api")
 
 	api.Post("/save-result", handlers.SaveResult)
+	api.Post("/save-results", handlers.SaveResults)
+
+	// Artifacts (content-addressed screenshots)
+	api.Head("/artifacts/:hash", handlers.HasArtifact)
+	api.Get("/artifacts/:hash", handlers.GetArtifact)
+	api.Post("/artifacts/:hash", handlers.UploadArtifact)
 	api.Get("/results", handlers.GetResults)
 	api.Get("/results/daily", handlers.GetDailyResults)
 	api.Get("/stats", handlers.GetStats)
@@ -32,6 +38,10 @@ func SetupRoutes(app *fiber.App) {
 	api.Post("/queue-job", handlers.QueueJob)
 	api.Get("/jobs/next", handlers.GetNextJob)
 	api.Post("/jobs/update-status", handlers.UpdateJobStatus)
+	api.Post("/jobs/renew-lease", handlers.RenewLease)
+	api.Post("/jobs/release", handlers.ReleaseWorkerJobs)
+	api.Post("/jobs/events", handlers.IngestEvents)
+	api.Get("/jobs/:id/events", handlers.GetJobEvents)
 	api.Delete("/jobs/queue", handlers.ClearQueue)
 
 	// Worker Heartbeat
@@ -3,9 +3,11 @@ package scheduler
 import (
 	"context"
 	"log"
+	"os"
 	"time"
 
 	"web-automation-dashboard/database"
+	"web-automation-dashboard/handlers"
 	"web-automation-dashboard/models"
 
 	"github.com/robfig/cron/v3"
@@ -31,6 +33,8 @@ func StartCron() {
 func queueJob() {
 	job := models.Job{
 		Type:      "FullSuite",
+		Priority:  models.PriorityNightly,
+		Selection: os.Getenv("NIGHTLY_SELECTION"), // Empty defers to the worker's SUITE_SELECTION (all cases by default)
 		Status:    models.StatusPending,
 		CreatedAt: time.Now(),
 		UpdatedAt: time.Now(),
@@ -41,5 +45,6 @@ func queueJob() {
 		log.Printf("Scheduler Error: Failed to queue job: %v", err)
 	} else {
 		log.Printf("Scheduler: Job queued successfully.")
+		handlers.NotifyJobQueued()
 	}
 }
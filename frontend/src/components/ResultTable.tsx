@@ -25,6 +25,8 @@ const ResultTable: React.FC<Props> = ({ results, onViewDetail }) => {
                             <td className="p-4">
                                 <span className={`px-2 py-1 rounded text-xs font-bold ${res.status === 'PASS'
                                         ? 'bg-green-100 text-green-800 dark:bg-green-900 dark:text-green-200'
+                                        : res.status === 'FLAKY'
+                                        ? 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200'
                                         : 'bg-red-100 text-red-800 dark:bg-red-900 dark:text-red-200'
                                     }`}>
                                     {res.status}
@@ -106,6 +106,8 @@ const DailyResults: React.FC = () => {
                                                 </div>
                                                 <span className={`text-xs px-2 py-1 rounded font-bold ${result.status === 'PASS'
                                                     ? 'bg-green-100 text-green-800 dark:bg-green-900/30 dark:text-green-200'
+                                                    : result.status === 'FLAKY'
+                                                    ? 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900/30 dark:text-yellow-200'
                                                     : 'bg-red-100 text-red-800 dark:bg-red-900/30 dark:text-red-200'
                                                     }`}>
                                                     {result.status}
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { getProject, getProjectResults, getProjectCases, createProjectCase, updateProjectCase, deleteProjectCase, runTest } from '../services/api';
+import { getProject, getProjectResults, getProjectCases, createProjectCase, updateProjectCase, deleteProjectCase, runTest, getArtifactUrl } from '../services/api';
 import { Project, TestResult, ProjectCase } from '../types';
 import StatsCard from '../components/StatsCard';
 import ResultTable from '../components/ResultTable';
@@ -356,9 +356,12 @@ const ProjectDetail: React.FC = () => {
                                     <h3 className="text-sm font-semibold text-gray-500 uppercase mb-2">Status</h3>
                                     <span className={`px-3 py-1 rounded-full text-sm font-bold ${selectedResult.status === 'PASS'
                                         ? 'bg-green-100 text-green-800 dark:bg-green-900 dark:text-green-200'
+                                        : selectedResult.status === 'FLAKY'
+                                        ? 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200'
                                         : 'bg-red-100 text-red-800 dark:bg-red-900 dark:text-red-200'
                                         }`}>
                                         {selectedResult.status}
+                                        {selectedResult.attempts && selectedResult.attempts > 1 ? ` (${selectedResult.attempts} attempts)` : ''}
                                     </span>
                                 </div>
                                 <div>
@@ -389,11 +392,11 @@ const ProjectDetail: React.FC = () => {
                                 </div>
                             )}
 
-                            {selectedResult.screenshotBase64 ? (
+                            {selectedResult.screenshotBase64 || selectedResult.screenshotRef ? (
                                 <div>
                                     <h3 className="text-sm font-semibold text-gray-500 uppercase mb-2">Screenshot</h3>
                                     <div className="border border-gray-200 dark:border-gray-700 rounded-lg overflow-hidden">
-                                        <img src={selectedResult.screenshotBase64} alt="Failure Screenshot" className="w-full h-auto" />
+                                        <img src={selectedResult.screenshotRef ? getArtifactUrl(selectedResult.screenshotRef) : selectedResult.screenshotBase64} alt="Failure Screenshot" className="w-full h-auto" />
                                     </div>
                                 </div>
                             ) : (
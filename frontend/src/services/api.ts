@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { TestResult, Stats, Project } from '../types';
+import { TestResult, Stats, Project, JobEvent } from '../types';
 
 // Environment Logic
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:3000/api';
@@ -14,6 +14,8 @@ const api = axios.create({
     },
 });
 
+export const getArtifactUrl = (hash: string) => `${BASE_URL}/artifacts/${hash}`;
+
 export const getResults = async () => {
     const response = await api.get<{ success: boolean; data: TestResult[] }>('/results');
     return response.data.data;
@@ -48,6 +50,13 @@ export const runTest = async (projectId?: string, testFilter?: string) => {
     }
 };
 
+// Live progress of a running job; pass the last seen ts to get only newer events
+export const getJobEvents = async (jobId: string, since?: number) => {
+    const response = await api.get<{ success: boolean; data: JobEvent[] }>(`/jobs/${jobId}/events`, {
+        params: since !== undefined ? { since } : undefined,
+    });
+    return response.data.data;
+};
 
 // Project APIs
 export const getProjects = async () => {
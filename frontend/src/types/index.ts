@@ -10,31 +10,61 @@ export interface TestResult {
     id: string;
     projectId?: string;
     testName: string;
-    status: 'PASS' | 'FAIL';
+    status: 'PASS' | 'FAIL' | 'FLAKY'; // FLAKY: passed on retry
     message: string;
     duration: number;
     timestamp: string;
     screenshotBase64?: string;
+    screenshotRef?: string;
+    attempts?: number;
+    visual?: VisualCheck[];
     errorStack?: string;
     browser: string;
     environment: string;
 }
 
+export interface VisualCheck {
+    name: string;
+    status: 'identical' | 'passed' | 'changed' | 'new' | 'approved';
+    score: number; // Share of changed pixels
+    hashDistance: number;
+    size?: [number, number];
+    bbox?: [number, number, number, number]; // Region of change: left, top, right, bottom
+    tileSize?: number;
+    tiles?: { x: number; y: number; w: number; h: number; ref: string }[]; // Changed tiles only (artifact hashes)
+    maskRef?: string;
+    cropRef?: string;
+    cropBase64?: string;
+}
+
 export interface Stats {
     total: number;
     passed: number;
     failed: number;
+    flaky?: number;
 }
 
 export interface Job {
     id: string;
     projectId?: string;
     type: string;
+    priority?: number; // 3 = interactive, 2 = suite, 1 = nightly
     status: 'Pending' | 'Processing' | 'Completed' | 'Failed';
     createdAt: string;
     updatedAt: string;
 }
 
+export interface JobEvent {
+    id: string;
+    jobId: string;
+    workerId?: string;
+    seq: number;
+    ts: number; // Unix seconds on the worker
+    kind: 'job.started' | 'job.status' | 'case.started' | 'case.finished' | 'case.retry' | 'case.killed' | 'case.row' | 'step' | 'wait' | 'screenshot' | 'log';
+    slot?: string;
+    data?: Record<string, any>;
+}
+
 export interface ProjectCase {
     id: string;
     projectId: string;